@@ -0,0 +1,26 @@
+"""GUI-free core of the Python Inventory System."""
+from .analytics import BUCKETS, CHART_TYPES, WEEKDAYS, DailyRollup, SalesAggregates, chart_data
+from .billing import TAX_RATE, BillIdAllocator, build_bill, format_receipt, line_item, prepare_batch
+from .imports import format_import_report, import_delivery, read_delivery
+from .reorder import COVER_DAYS, DEMAND_DAYS, LEAD_TIME_DAYS, demand_rates, read_suppliers, reorder_plan
+from .reports import REPORT_TYPES, export_report, format_purchase_order, format_purchase_orders
+from .search import BillIndex, NameIndex
+from .service import InventoryService
+from .storage import (
+    BILL_COLUMNS,
+    INVENTORY_COLUMNS,
+    TRANSACTION_COLUMNS,
+    CsvBackend,
+    SqliteBackend,
+    get_backend,
+    import_csv_to_sqlite,
+    load_bills,
+    load_inventory,
+    load_transactions,
+    open_backend,
+    save_bills,
+    save_inventory,
+    save_transactions,
+    set_backend,
+)
+from .store import InventoryStore
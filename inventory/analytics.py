@@ -0,0 +1,188 @@
+"""Sales aggregates behind the charts."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+BUCKETS = ("day", "week", "month")
+
+def bucket_start(days, bucket):
+    """First day of the day/week (Monday)/month each datetime64[D] falls in"""
+    if bucket == "day":
+        return days
+    if bucket == "week":
+        # 1970-01-01, day 0, was a Thursday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if bucket == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+class DailyRollup:
+    """Units sold per (day, product), kept sorted by day.
+
+    A date-range query binary-searches the day column and aggregates only
+    the rollup rows inside the range, so "last 90 days" never touches older
+    history. New sales are queued and folded in on the next query; offline
+    bills for past days just trigger a re-sort.
+    """
+
+    def __init__(self):
+        self.days = np.empty(0, dtype="datetime64[D]")
+        self.products = np.empty(0, dtype=np.int64)
+        self.units = np.empty(0, dtype=np.int64)
+        self.pending = []
+
+    def record(self, days, products, units):
+        self.pending.append(pd.DataFrame({"day": days, "product_id": products, "units": units}))
+
+    def _fold(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        new = pd.concat(pending, ignore_index=True).groupby(["day", "product_id"])["units"].sum()
+        days = new.index.get_level_values("day").to_numpy().astype("datetime64[D]")
+        in_order = not len(self.days) or not len(days) or days[0] >= self.days[-1]
+        self.days = np.concatenate([self.days, days])
+        self.products = np.concatenate([self.products, new.index.get_level_values("product_id").to_numpy(np.int64)])
+        self.units = np.concatenate([self.units, new.to_numpy(np.int64)])
+        if not in_order:
+            order = np.argsort(self.days, kind="stable")
+            self.days, self.products, self.units = self.days[order], self.products[order], self.units[order]
+
+    def _range(self, start, end):
+        """Slice of the rollup covering days in [start, end)"""
+        self._fold()
+        lo = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, "D"))
+        hi = len(self.days) if end is None else np.searchsorted(self.days, np.datetime64(end, "D"))
+        return slice(lo, hi)
+
+    def units_by_product(self, start=None, end=None):
+        rows = self._range(start, end)
+        return pd.Series(self.units[rows]).groupby(self.products[rows]).sum()
+
+    def totals(self, start=None, end=None, bucket="day"):
+        """Units per day/week/month, with empty buckets filled in as zero"""
+        rows = self._range(start, end)
+        days, units = self.days[rows], self.units[rows]
+        if not len(days):
+            return pd.Series(dtype="int64")
+        # Rows are sorted by day, so each day is one contiguous run
+        days, first = np.unique(days, return_index=True)
+        totals = pd.Series(np.add.reduceat(units, first)).groupby(bucket_start(days, bucket)).sum()
+        if totals.empty:
+            return totals
+        step = {"day": "D", "week": "W-MON", "month": "MS"}[bucket]
+        return totals.reindex(pd.date_range(totals.index[0], totals.index[-1], freq=step), fill_value=0)
+
+    def sales(self, start=None, end=None, bucket="day", products=None):
+        """Units per (bucket, product_id), optionally for a subset of products"""
+        rows = self._range(start, end)
+        days, pids, units = self.days[rows], self.products[rows], self.units[rows]
+        if products is not None:
+            keep = np.isin(pids, list(products))
+            days, pids, units = days[keep], pids[keep], units[keep]
+        return pd.Series(units).groupby([bucket_start(days, bucket), pids]).sum().rename_axis(["bucket", "product_id"])
+
+class SalesAggregates:
+    """Running sales totals for the charts, updated as each sale is recorded.
+
+    The transaction log is grouped once at startup; after that record() folds
+    in just the new rows, so charts never re-group the full history. The
+    log has no price column, so revenue is valued at the catalogue price.
+    """
+
+    def __init__(self, txn, prices):
+        self.rebuild(txn, prices)
+
+    def rebuild(self, txn, prices):
+        self.daily = DailyRollup()
+        self.prices = prices
+        self.by_product = {}
+        self.revenue = {}
+        self.by_weekday = [0] * 7
+        self.matrix = {}
+        self.version = 0
+        self.record(txn, prices)
+
+    def record(self, txn, prices):
+        self.prices = prices
+        if txn.empty:
+            return
+        dates = pd.to_datetime(txn["date"])
+        weekday = dates.dt.dayofweek
+        dated = dates.notna().to_numpy()
+        self.daily.record(dates.to_numpy()[dated].astype("datetime64[D]"), txn["product_id"].to_numpy()[dated],
+                          txn["quantity_sold"].to_numpy()[dated])
+        amount = txn["quantity_sold"] * txn["product_id"].map(prices).fillna(0)
+        units = txn["quantity_sold"].groupby([txn["product_id"], weekday]).sum()
+        for (pid, day), qty in units.items():
+            pid, day, qty = int(pid), int(day), int(qty)
+            self.by_product[pid] = self.by_product.get(pid, 0) + qty
+            self.by_weekday[day] += qty
+            self.matrix.setdefault(pid, [0] * 7)[day] += qty
+        for pid, value in amount.groupby(txn["product_id"]).sum().items():
+            self.revenue[int(pid)] = self.revenue.get(int(pid), 0.0) + float(value)
+        self.version += 1
+
+    def weekday_totals(self):
+        return pd.Series(self.by_weekday, index=WEEKDAYS)
+
+    def product_totals(self):
+        return pd.Series(self.by_product, dtype="int64")
+
+    def top_products(self, n=10, by="units", start=None, end=None):
+        """Best sellers of all time, or of [start, end) from the daily rollup"""
+        if start is not None or end is not None:
+            totals = self.daily.units_by_product(start, end)
+            if by == "revenue":
+                # An empty catalogue leaves prices untyped, and nlargest refuses object dtype
+                totals = (totals * self.prices.reindex(totals.index).fillna(0)).astype("float64")
+        else:
+            totals = pd.Series(self.revenue, dtype="float64") if by == "revenue" else self.product_totals()
+        return totals.nlargest(n)
+
+    def weekday_matrix(self, top=None):
+        """Units per weekday x product; with top, only the best sellers plus an "Other" total"""
+        if top is None:
+            return pd.DataFrame(self.matrix, index=WEEKDAYS, dtype="int64")
+        best = self.product_totals().nlargest(top).index
+        matrix = pd.DataFrame({pid: self.matrix[pid] for pid in best}, index=WEEKDAYS, dtype="int64")
+        other = pd.Series(self.by_weekday, index=WEEKDAYS) - matrix.sum(axis=1)
+        if len(self.matrix) > len(best):
+            matrix["Other"] = other
+        return matrix
+
+CHART_TYPES = ["Sales by Day", "Top Products", "Top Products by Revenue", "Sales Heatmap",
+               "Top 20 by Revenue (90 Days)", "Daily Sales (90 Days)", "Weekly Sales", "Monthly Sales"]
+RECENT_DAYS = 90
+# The heatmap shows this many best sellers, with everything else summed into "Other"
+HEATMAP_PRODUCTS = 25
+
+def chart_data(aggregates, store, chart_type, now=None):
+    """The series or matrix a chart plots, with product IDs resolved to names"""
+    today = (now or datetime.now()).date()
+    since = today - timedelta(days=RECENT_DAYS - 1)
+    if chart_type == "Sales by Day":
+        return aggregates.weekday_totals()
+    if chart_type == "Daily Sales (90 Days)":
+        return aggregates.daily.totals(since).reindex(pd.date_range(since, today), fill_value=0)
+    if chart_type == "Weekly Sales":
+        return aggregates.daily.totals(bucket="week")
+    if chart_type == "Monthly Sales":
+        return aggregates.daily.totals(bucket="month")
+    if chart_type == "Top 20 by Revenue (90 Days)":
+        prod = aggregates.top_products(20, by="revenue", start=since)
+    elif chart_type == "Top Products":
+        prod = aggregates.top_products(10)
+    elif chart_type == "Top Products by Revenue":
+        prod = aggregates.top_products(10, by="revenue")
+    elif chart_type == "Sales Heatmap":
+        prod = aggregates.weekday_matrix(top=HEATMAP_PRODUCTS)
+        pids = [pid for pid in prod.columns if pid != "Other"]
+        prod.columns = store.names_for(pids) + ["Other"] * (len(prod.columns) - len(pids))
+        return prod
+    else:
+        raise ValueError(f"Unknown chart type: {chart_type}")
+    prod.index = store.names_for(prod.index)
+    return prod
@@ -0,0 +1,319 @@
+"""Seeded synthetic data and a headless benchmark of the main data paths."""
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .analytics import CHART_TYPES, SalesAggregates, chart_data
+from .billing import BASE32, SEQ_WIDTH, TAX_RATE, TILL_WIDTH, TIME_WIDTH
+from .reports import REPORT_TYPES
+from .search import BillIndex
+from .service import InventoryService
+from .storage import BILL_COLUMNS, INVENTORY_COLUMNS, TRANSACTION_COLUMNS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==============================================
+# Synthetic Data
+# ==============================================
+# Product names are brand + item + pack size, so name search sees realistic
+# shared words and trigrams. Sales follow a power law over a shuffled
+# catalogue (a few best sellers, a long tail), arrive in bills of 1-8 lines
+# during opening hours, and carry time-ordered bill IDs from a few tills.
+BRANDS = ["Amul", "Britannia", "Parle", "Tata", "Nestle", "Haldiram", "Dabur", "Patanjali", "ITC", "Mother Dairy",
+          "Fortune", "Aashirvaad", "Surf", "Colgate", "Lipton", "Maggi", "Kissan", "Everest", "MDH", "Catch"]
+ITEMS = ["Milk", "Butter", "Biscuits", "Tea", "Coffee", "Atta", "Rice", "Sugar", "Salt", "Oil", "Soap", "Shampoo",
+         "Toothpaste", "Noodles", "Ketchup", "Jam", "Masala", "Namkeen", "Honey", "Ghee", "Paneer", "Curd",
+         "Detergent", "Chips", "Juice", "Cornflakes", "Dal", "Besan", "Poha", "Vermicelli"]
+SIZES = ["100g", "200g", "250g", "500g", "1kg", "2kg", "5kg", "250ml", "500ml", "1L", "Pack of 4", "Family Pack"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Ananya", "Rohan", "Priya", "Vikram", "Meera", "Arjun", "Kavya",
+               "Sanjay", "Neha", "Rahul", "Pooja", "Karan", "Sneha", "Amit", "Riya", "Nikhil", "Tara"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Singh", "Nair", "Das", "Mehta", "Khan",
+              "Joshi", "Rao", "Bose", "Kapoor", "Verma", "Pillai", "Shah", "Menon", "Chopra", "Mishra"]
+WALK_IN_SHARE = 0.6
+TILLS = 4
+
+def generate_catalogue(rng, products):
+    ids = np.arange(1, products + 1)
+    names = (np.array(BRANDS)[rng.integers(0, len(BRANDS), products)].astype(object) + " " +
+             np.array(ITEMS)[rng.integers(0, len(ITEMS), products)] + " " +
+             np.array(SIZES)[rng.integers(0, len(SIZES), products)] + " #" + ids.astype(str))
+    return pd.DataFrame({
+        "product_id": ids,
+        "name": names,
+        "quantity": rng.integers(0, 500, products),
+        "price": np.round(rng.lognormal(4, 0.8, products), 2),
+        "min_stock": rng.integers(5, 50, products)
+    }, columns=INVENTORY_COLUMNS)
+
+def encode_base32_array(values, width):
+    """Vectorized encode_base32 for an int64 array"""
+    digits = values[:, None] // 32 ** np.arange(width - 1, -1, -1, dtype=np.int64) % 32
+    return np.array(list(BASE32))[digits].view(f"<U{width}").ravel()
+
+def format_minutes(ms, fmt):
+    """strftime for millisecond timestamps, formatting each distinct minute once"""
+    minutes, inverse = np.unique(ms // 60_000, return_inverse=True)
+    return pd.to_datetime(minutes, unit="m").strftime(fmt).to_numpy(dtype=object)[inverse]
+
+def sequence_numbers(stamps, tills, carry):
+    """Per-(millisecond, till) bill sequence numbers for sorted stamps, numbered as BillIdAllocator does.
+
+    carry maps (stamp, till) to the next free number on the stamp the
+    previous chunk ended with (squeezing days into opening hours can put
+    both chunks on it), and is updated for the next chunk.
+    """
+    key = stamps * TILLS + tills
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+    seq = np.empty(len(key), dtype=np.int64)
+    seq[order] = np.arange(len(key)) - np.repeat(starts, np.diff(np.r_[starts, len(key)]))
+    for (stamp, till), first in carry.items():
+        seq[(stamps == stamp) & (tills == till)] += first
+    last = stamps[-1]
+    following = {key: first for key, first in carry.items() if key[0] == last}
+    for till in np.unique(tills[stamps == last]):
+        following[(last, till)] = int(seq[(stamps == last) & (tills == till)].max()) + 1
+    carry.clear()
+    carry.update(following)
+    return seq
+
+def _bill_chunk(rng, catalogue, popularity, customers, start_ms, end_ms, lines, utc_offset_ms, carry):
+    """Bills (and their transaction rows) with exactly `lines` lines, timed in [start_ms, end_ms)"""
+    sizes = rng.integers(1, 9, lines // 4 + 8)
+    while sizes.sum() < lines:
+        sizes = np.concatenate([sizes, rng.integers(1, 9, lines // 4 + 8)])
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), lines) + 1]
+    sizes[-1] -= sizes.sum() - lines
+    bills = len(sizes)
+    # Spread bills over whole local days, then squeeze each day into opening hours (09:00-21:00)
+    local = np.sort(rng.integers(start_ms, end_ms, bills)) + utc_offset_ms
+    day = local - local % 86_400_000
+    local = day + 32_400_000 + (local - day) // 2
+    stamps = local - utc_offset_ms
+    tills = rng.integers(0, TILLS, bills)
+    bill_ids = np.char.add(np.char.add(encode_base32_array(stamps, TIME_WIDTH), encode_base32_array(tills, TILL_WIDTH)),
+                           encode_base32_array(sequence_numbers(stamps, tills, carry), SEQ_WIDTH)).astype(object)
+    walk_in = rng.random(bills) < WALK_IN_SHARE
+    customer = np.where(walk_in, "Walk-in Customer", customers[rng.integers(0, len(customers), bills)])
+
+    line_bill = np.repeat(np.arange(bills), sizes)
+    pos = rng.choice(len(catalogue), len(line_bill), p=popularity)
+    qty = rng.integers(1, 6, len(line_bill))
+    price = catalogue["price"].to_numpy()[pos]
+    subtotal = np.round(qty * price, 2)
+    bill_rows = pd.DataFrame({
+        "bill_id": bill_ids[line_bill],
+        "date": format_minutes(local, "%Y-%m-%d %H:%M")[line_bill],
+        "product": catalogue["name"].to_numpy()[pos],
+        "quantity": qty,
+        "price": price,
+        "subtotal": subtotal,
+        "tax": np.round(subtotal * TAX_RATE, 2),
+        "total": np.round(subtotal * (1 + TAX_RATE), 2),
+        "customer": customer[line_bill]
+    }, columns=BILL_COLUMNS)
+    sales = pd.DataFrame({
+        "date": format_minutes(local, "%Y-%m-%d")[line_bill],
+        "time": format_minutes(local, "%H:%M")[line_bill],
+        "product_id": catalogue["product_id"].to_numpy()[pos],
+        "quantity_sold": qty
+    }, columns=TRANSACTION_COLUMNS)
+    return bill_rows, sales
+
+def generate(data_dir, products=10_000, lines=100_000, days=365, seed=0, chunksize=500_000, now=None):
+    """Write inventory.csv, transactions.csv and bills.csv with `lines` sale lines over the last `days` days.
+
+    The same arguments always produce the same files. Sales are generated
+    and written chunksize lines at a time, so memory stays flat up to
+    tens of millions of rows.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    catalogue = generate_catalogue(rng, products)
+    catalogue.to_csv(os.path.join(data_dir, "inventory.csv"), index=False)
+
+    weights = 1.0 / np.arange(1, products + 1) ** 1.1
+    popularity = (weights / weights.sum())[rng.permutation(products)]
+    customers = np.array([f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES], dtype=object)
+
+    end = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_ms = int(end.timestamp() * 1000)
+    utc_offset_ms = int(end.astimezone().utcoffset().total_seconds() * 1000)
+    start_ms = int((end - timedelta(days=days)).timestamp() * 1000)
+    chunks = max(1, -(-lines // chunksize))
+    bills_path = os.path.join(data_dir, "bills.csv")
+    sales_path = os.path.join(data_dir, "transactions.csv")
+    written = 0
+    carry = {}
+    for i in range(chunks):
+        size = min(chunksize, lines - written)
+        lo = start_ms + (end_ms - start_ms) * i // chunks
+        hi = start_ms + (end_ms - start_ms) * (i + 1) // chunks
+        bill_rows, sales = _bill_chunk(rng, catalogue, popularity, customers, lo, hi, size, utc_offset_ms, carry)
+        bill_rows.to_csv(bills_path, mode="a" if i else "w", header=not i, index=False)
+        sales.to_csv(sales_path, mode="a" if i else "w", header=not i, index=False)
+        written += len(sales)
+    return {"products": products, "lines": written}
+
+# ==============================================
+# Benchmarks
+# ==============================================
+# Each operation is a (setup, run) pair: setup(bench) prepares inputs
+# outside the timer and run(bench, prepared) is the timed part, returning
+# the number of rows it handled (None where that means nothing). Checkout
+# writes real bills, so only point the benchmark at a generated data set.
+FILTER_QUERIES = ["am", "milk", "tata tea", "500g", "family pack", "#123"]
+BILL_QUERIES = ["walk-in", "sharma", "biscuits", "amul butter", "priya patel"]
+CHECKOUT_BILLS = 50
+
+class Benchmark:
+    """One service on the data under test, plus a way to open fresh backends on the same data"""
+
+    def __init__(self, open_backend, folder):
+        self.open_backend = open_backend
+        self.folder = folder
+        self.service = InventoryService(open_backend())
+
+def _no_setup(bench):
+    return None
+
+def _load_inventory(bench, _):
+    # A new backend each run; the snapshot cache is warm after the first
+    return len(InventoryService(bench.open_backend()).store)
+
+def _filter(bench, _):
+    rows = 0
+    for query in FILTER_QUERIES:
+        inv = bench.service.store.filter(query)
+        # The same column pulls refresh_inventory_table hands to the tree
+        [inv[column].to_numpy() for column in ("product_id", "name", "quantity", "price")]
+        rows += len(inv)
+    return rows
+
+def _checkout_setup(bench):
+    stock = bench.service.store.all()
+    stocked = stock.index[stock["quantity"] >= 20].to_numpy()
+    rng = np.random.default_rng(len(stock))
+    return [[(int(pid), 1) for pid in rng.choice(stocked, rng.integers(1, 6), replace=False)]
+            for _ in range(CHECKOUT_BILLS)]
+
+def _checkout(bench, baskets):
+    for basket in baskets:
+        bench.service.sell(basket, "Benchmark")
+    return len(baskets)
+
+def _bill_index(bench, _):
+    bills = bench.service.backend.load_bills(typed=True)
+    BillIndex(bills).search()
+    return len(bills)
+
+def _bill_search(bench, _):
+    return sum(len(bench.service.bill_index.search(query)) for query in BILL_QUERIES)
+
+def _aggregates_setup(bench):
+    return bench.service.backend.load_transactions(typed=True)
+
+def _aggregates(bench, txn):
+    SalesAggregates(txn, bench.service.store.all()["price"])
+    return len(txn)
+
+def _charts(bench, _):
+    for chart_type in CHART_TYPES:
+        chart_data(bench.service.aggregates, bench.service.store, chart_type)
+    return len(CHART_TYPES)
+
+def _reorder(bench, _):
+    return len(bench.service.reorder_plan())
+
+def _exporter(report_type):
+    def run(bench, _):
+        bench.service.export_report(report_type, os.path.join(bench.folder, f"{report_type}.csv"))
+    return run
+
+OPERATIONS = {
+    "load_inventory": (_no_setup, _load_inventory),
+    "load_transactions": (_no_setup, lambda bench, _: len(bench.service.backend.load_transactions(typed=True))),
+    "load_bills": (_no_setup, lambda bench, _: len(bench.service.backend.load_bills(typed=True))),
+    "filter": (_no_setup, _filter),
+    "checkout": (_checkout_setup, _checkout),
+    "bill_index": (_no_setup, _bill_index),
+    "bill_search": (_no_setup, _bill_search),
+    "aggregates": (_aggregates_setup, _aggregates),
+    "charts": (_no_setup, _charts),
+    "reorder": (_no_setup, _reorder),
+}
+OPERATIONS.update({f"export_{report_type}": (_no_setup, _exporter(report_type)) for report_type in REPORT_TYPES})
+
+def measure(bench, name, repeat=3):
+    """Time one operation `repeat` times, then once more under tracemalloc for its peak allocation"""
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown benchmark: {name}")
+    setup, run = OPERATIONS[name]
+    runs, rows = [], None
+    for _ in range(repeat):
+        prepared = setup(bench)
+        start = time.perf_counter()
+        rows = run(bench, prepared)
+        runs.append(time.perf_counter() - start)
+    prepared = setup(bench)
+    tracemalloc.start()
+    try:
+        run(bench, prepared)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "op": name,
+        "rows": rows,
+        "runs": [round(seconds, 6) for seconds in runs],
+        "min": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+        "peak_mb": round(peak / 2**20, 2)
+    }
+
+def run_benchmarks(open_backend, operations=None, repeat=3, label=None):
+    """Run the named operations (default: all) on the data open_backend() opens; returns a JSON-ready dict"""
+    with tempfile.TemporaryDirectory() as folder:
+        bench = Benchmark(open_backend, folder)
+        results = [measure(bench, name, repeat) for name in operations or OPERATIONS]
+        backend = bench.service.backend
+        report = {
+            "label": label,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "backend": type(backend).__name__,
+            "data": {
+                "products": len(bench.service.store),
+                "transactions": len(backend.load_transactions(typed=True)),
+                "bill_lines": len(backend.load_bills(typed=True))
+            },
+            "results": results
+        }
+    if resource is not None:
+        # ru_maxrss is KiB on Linux but bytes on macOS
+        scale = 2**20 if platform.system() == "Darwin" else 2**10
+        report["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+    return report
+
+def write_results(report, path=None):
+    text = json.dumps(report, indent=2)
+    if path is None:
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
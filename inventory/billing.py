@@ -0,0 +1,244 @@
+"""Bill construction and receipt formatting."""
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime
+
+TAX_RATE = 0.05
+
+# ==============================================
+# Bill IDs
+# ==============================================
+# A bill ID is 15 Crockford base32 characters: 10 for the allocation time in
+# epoch milliseconds, 2 for the till number and 3 for a per-millisecond
+# sequence. IDs from one till are strictly increasing and IDs from different
+# tills never collide, so plain string order is time order and a date range
+# maps onto an ID range. The service claims the lowest till number no other
+# running till holds on the same data (see storage.claim_till), or exactly
+# INVENTORY_TILL_ID (0-1023) if that is set. Bill IDs made without a service
+# fall back to INVENTORY_TILL_ID or a number derived from the host and pid.
+BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+TIME_WIDTH, TILL_WIDTH, SEQ_WIDTH = 10, 2, 3
+MAX_TILL = 32 ** TILL_WIDTH - 1
+MAX_SEQ = 32 ** SEQ_WIDTH - 1
+
+def encode_base32(value, width):
+    chars = []
+    for _ in range(width):
+        value, digit = divmod(value, 32)
+        chars.append(BASE32[digit])
+    return "".join(reversed(chars))
+
+def configured_till_id():
+    """INVENTORY_TILL_ID, or None if it is not set"""
+    till = os.environ.get("INVENTORY_TILL_ID")
+    if till is None:
+        return None
+    till = int(till)
+    if not 0 <= till <= MAX_TILL:
+        raise ValueError(f"INVENTORY_TILL_ID must be between 0 and {MAX_TILL}.")
+    return till
+
+def default_till_id():
+    till = configured_till_id()
+    if till is not None:
+        return till
+    return zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode()) % (MAX_TILL + 1)
+
+class BillIdAllocator:
+    """Hands out time-ordered bill IDs for one till, skipping any already known"""
+
+    def __init__(self, till=None, known=None):
+        self.till = default_till_id() if till is None else till
+        self.prefix = encode_base32(self.till, TILL_WIDTH)
+        self.known = known if known is not None else set()
+        self.lock = threading.Lock()
+        self.last_ms = 0
+        self.seq = 0
+
+    def allocate(self):
+        with self.lock:
+            while True:
+                now = int(time.time() * 1000)
+                if now > self.last_ms:
+                    self.last_ms, self.seq = now, 0
+                elif self.seq < MAX_SEQ:
+                    self.seq += 1
+                else:
+                    # Sequence exhausted (or the clock stepped back): borrow the next millisecond
+                    self.last_ms, self.seq = self.last_ms + 1, 0
+                bill_id = encode_base32(self.last_ms, TIME_WIDTH) + self.prefix + encode_base32(self.seq, SEQ_WIDTH)
+                if bill_id not in self.known:
+                    self.known.add(bill_id)
+                    return bill_id
+
+_allocator = None
+
+def new_bill_id():
+    global _allocator
+    if _allocator is None:
+        _allocator = BillIdAllocator()
+    return _allocator.allocate()
+
+def line_item(store, pid, qty):
+    """Price one basket line against the catalogue, raising ValueError if it cannot be sold"""
+    if qty <= 0:
+        raise ValueError(f"Invalid quantity {qty}.")
+    if pid not in store:
+        raise ValueError("Product not found.")
+    product = store.get(pid)
+    if product["quantity"] < qty:
+        raise ValueError(f"Only {product['quantity']} units available.")
+    return {
+        "product_id": pid,
+        "name": product["name"],
+        "quantity": qty,
+        "price": product["price"],
+        "subtotal": qty * product["price"]
+    }
+
+def stock_deltas(items):
+    deltas = {}
+    for item in items:
+        deltas[item["product_id"]] = deltas.get(item["product_id"], 0) - item["quantity"]
+    return deltas
+
+def build_bill(items, customer=None, now=None, bill_id=None):
+    """Assemble a bill and the bills/transactions rows it writes"""
+    now = now or datetime.now()
+    bill_id = bill_id or new_bill_id()
+    customer = customer or "Walk-in Customer"
+    subtotal = sum(item["subtotal"] for item in items)
+    tax = subtotal * TAX_RATE
+    rows = [{
+        "bill_id": bill_id,
+        "date": now.strftime("%Y-%m-%d %H:%M"),
+        "product": item["name"],
+        "quantity": item["quantity"],
+        "price": item["price"],
+        "subtotal": round(item["subtotal"], 2),
+        "tax": round(item["subtotal"] * TAX_RATE, 2),
+        "total": round(item["subtotal"] * (1 + TAX_RATE), 2),
+        "customer": customer
+    } for item in items]
+    sales = [{
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M"),
+        "product_id": item["product_id"],
+        "quantity_sold": item["quantity"]
+    } for item in items]
+    return {
+        "bill_id": bill_id,
+        "date": now,
+        "customer": customer,
+        "items": list(items),
+        "subtotal": subtotal,
+        "tax": tax,
+        "total": subtotal + tax,
+        "rows": rows,
+        "sales": sales,
+        "deltas": stock_deltas(items)
+    }
+
+def prepare_batch(store, bills, known_ids=(), allocate=new_bill_id, held=None):
+    """Validate and price a batch of offline bills against one stock snapshot.
+
+    Each bill is a dict with "items" (product_id, quantity and optionally the
+    price charged) and optional "customer", "date" and "bill_id". Bills are
+    checked in order against running stock levels, so one that would oversell
+    is rejected without affecting the rest of the batch. A bill_id already in
+    known_ids or earlier in the batch is rejected as a duplicate, so a till
+    can safely re-upload a batch; bills without one get a fresh ID from
+    allocate. Units in held (a Series keyed by product_id, e.g. stock other
+    tills' baskets are holding) are not available to the batch. Nothing is
+    committed.
+    """
+    wanted = set()
+    for bill in bills:
+        for item in bill.get("items", ()):
+            try:
+                wanted.add(int(item["product_id"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+    snapshot = store.all()
+    known = snapshot.index.intersection(list(wanted))
+    catalogue = snapshot.loc[known]
+    available = catalogue["quantity"]
+    if held is not None:
+        available = available - held.reindex(known, fill_value=0)
+    stock = dict(zip(known, available.tolist()))
+    names = dict(zip(known, catalogue["name"].tolist()))
+    prices = dict(zip(known, catalogue["price"].tolist()))
+
+    accepted, rejected, batch_ids = [], [], set()
+    for i, bill in enumerate(bills):
+        try:
+            bill_id = bill.get("bill_id")
+            if bill_id is not None:
+                bill_id = str(bill_id)
+                if bill_id in known_ids or bill_id in batch_ids:
+                    raise ValueError(f"Duplicate bill ID {bill_id}.")
+            items, needed = [], {}
+            for item in bill["items"]:
+                pid, qty = int(item["product_id"]), int(item["quantity"])
+                if pid not in stock:
+                    raise ValueError(f"Product {pid} not found.")
+                if qty <= 0:
+                    raise ValueError(f"Invalid quantity {qty} for product {pid}.")
+                price = float(item.get("price", prices[pid]))
+                if not price >= 0:
+                    raise ValueError(f"Invalid price {price} for product {pid}.")
+                needed[pid] = needed.get(pid, 0) + qty
+                items.append({
+                    "product_id": pid,
+                    "name": names[pid],
+                    "quantity": qty,
+                    "price": price,
+                    "subtotal": qty * price
+                })
+            if not items:
+                raise ValueError("Bill has no items.")
+            for pid, qty in needed.items():
+                if stock[pid] < qty:
+                    raise ValueError(f"Only {stock[pid]} units of product {pid} available.")
+            date = bill.get("date")
+            if isinstance(date, str):
+                date = datetime.fromisoformat(date)
+            elif date is not None and not isinstance(date, datetime):
+                raise ValueError(f"Invalid date {date!r}.")
+            built = build_bill(items, bill.get("customer"), date, bill_id or allocate())
+        except KeyError as e:
+            rejected.append({"index": i, "reason": f"Missing field {e}."})
+            continue
+        except (TypeError, ValueError) as e:
+            rejected.append({"index": i, "reason": str(e)})
+            continue
+        for pid, qty in needed.items():
+            stock[pid] -= qty
+        batch_ids.add(built["bill_id"])
+        accepted.append(built)
+    return accepted, rejected
+
+def format_receipt(bill):
+    receipt = f"{'INVOICE':^40}\n"
+    receipt += f"{'-'*40}\n"
+    receipt += f"Bill ID: {bill['bill_id']}\n"
+    receipt += f"Date: {bill['date'].strftime('%Y-%m-%d %H:%M')}\n"
+    receipt += f"Customer: {bill['customer']}\n"
+    receipt += f"{'-'*40}\n"
+    receipt += f"{'Item':<20}{'Qty':>5}{'Price':>10}{'Total':>10}\n"
+    receipt += f"{'-'*40}\n"
+    
+    for item in bill["items"]:
+        receipt += f"{item['name'][:18]:<20}{item['quantity']:>5}₹{item['price']:>9.2f}₹{item['subtotal']:>9.2f}\n"
+    
+    receipt += f"{'-'*40}\n"
+    receipt += f"{'Subtotal:':<30}₹{bill['subtotal']:>9.2f}\n"
+    receipt += f"{'Tax (5%):':<30}₹{bill['tax']:>9.2f}\n"
+    receipt += f"{'-'*40}\n"
+    receipt += f"{'TOTAL:':<30}₹{bill['total']:>9.2f}\n"
+    receipt += f"{'-'*40}\n"
+    receipt += f"{'Thank you for shopping with us!':^40}\n"
+    return receipt
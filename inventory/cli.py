@@ -0,0 +1,167 @@
+"""Command-line interface: python -m inventory <command>."""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from .bench import OPERATIONS, generate, run_benchmarks, write_results
+from .billing import format_receipt
+from . import instrument
+from .imports import format_import_report
+from .reorder import COVER_DAYS, LEAD_TIME_DAYS, read_suppliers
+from .reports import REPORT_TYPES, format_purchase_orders
+from .service import InventoryService
+from .storage import DATA_DIR, import_csv_to_sqlite, open_backend
+
+def parse_item(text):
+    try:
+        pid, qty = text.split(":")
+        return int(pid), int(qty)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PRODUCT_ID:QUANTITY, got {text!r}")
+
+def read_json_lines(path):
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m inventory", description="Python Inventory System without the GUI")
+    parser.add_argument("--backend", choices=["csv", "sqlite"], help="storage backend (default: $INVENTORY_BACKEND or csv)")
+    parser.add_argument("--data-dir", help="CSV data directory (default: data)")
+    parser.add_argument("--db", help="SQLite database file (default: data/inventory.db)")
+    parser.add_argument("--stats", action="store_true", help="print per-call timings and row counts to stderr at exit")
+    parser.add_argument("--profile", metavar="FILE", help="write a cProfile trace of the command (open with pstats/snakeviz)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bill = commands.add_parser("bill", help="create a bill and print its receipt")
+    bill.add_argument("items", nargs="+", type=parse_item, metavar="PRODUCT_ID:QUANTITY")
+    bill.add_argument("--customer", help="customer name (default: Walk-in Customer)")
+
+    ingest = commands.add_parser("ingest", help="commit a batch of offline bills from a JSON Lines file")
+    ingest.add_argument("path", help="one bill per line: {\"customer\", \"date\", \"items\": [{\"product_id\", \"quantity\"}]} ('-' for stdin)")
+
+    restock = commands.add_parser("restock", help="add stock to a product")
+    restock.add_argument("product_id", type=int)
+    restock.add_argument("quantity", type=int)
+
+    delivery = commands.add_parser("import-delivery", help="apply a delivery file of stock and price changes")
+    delivery.add_argument("path", help="CSV with product_id and quantity and/or price columns ('-' for stdin)")
+    delivery.add_argument("--chunksize", type=int, default=50_000)
+
+    report = commands.add_parser("report", help="export a report to CSV")
+    report.add_argument("report_type", choices=REPORT_TYPES)
+    report.add_argument("-o", "--output", help="output file; a .gz or .zst suffix compresses it (default: <type>_report.csv)")
+    report.add_argument("--from", dest="start", type=datetime.fromisoformat, help="first date to include (YYYY-MM-DD[ HH:MM])")
+    report.add_argument("--to", dest="end", type=datetime.fromisoformat, help="date to stop before (YYYY-MM-DD[ HH:MM])")
+    report.add_argument("--compression", choices=["gzip", "zstd"])
+
+    reorder = commands.add_parser("reorder", help="print demand-based purchase orders, one per supplier")
+    reorder.add_argument("--lead-time", type=int, default=LEAD_TIME_DAYS, help=f"days until delivery (default: {LEAD_TIME_DAYS})")
+    reorder.add_argument("--cover", type=int, default=COVER_DAYS, help=f"days of demand each order covers (default: {COVER_DAYS})")
+    reorder.add_argument("--suppliers", help="CSV with product_id and supplier columns")
+    reorder.add_argument("--supplier", default="Unassigned", help="supplier for products not in --suppliers")
+    reorder.add_argument("-o", "--output", help="also write the full plan to this CSV")
+
+    generate = commands.add_parser("generate", help="write a seeded synthetic data set for benchmarking")
+    generate.add_argument("target", help="directory to write inventory.csv, transactions.csv and bills.csv into")
+    generate.add_argument("--products", type=int, default=10_000)
+    generate.add_argument("--lines", type=int, default=100_000, help="sale lines (rows in transactions.csv and bills.csv)")
+    generate.add_argument("--days", type=int, default=365, help="days of history ending yesterday")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--force", action="store_true", help="overwrite an existing data set")
+
+    bench = commands.add_parser("bench", help="time the main data paths; needs --data-dir or --db (checkout writes bills)")
+    bench.add_argument("--only", help=f"comma-separated operations: {', '.join(OPERATIONS)}")
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--label", help="free text stored with the results, e.g. a version")
+    bench.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+
+    importer = commands.add_parser("import-sqlite", help="import the CSV data directory into a SQLite database")
+    importer.add_argument("db_path")
+    importer.add_argument("--force", action="store_true", help="replace a database that already holds data")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.stats or args.profile or instrument.ENABLED:
+        instrument.install()
+    if args.profile:
+        instrument.recorder.start_profile()
+    try:
+        return run(args)
+    finally:
+        if args.profile:
+            path = instrument.recorder.stop_profile(args.profile)
+            print(f"Profile written to {path}" if path else "Nothing was profiled.", file=sys.stderr)
+
+def run(args):
+    if args.command == "import-sqlite":
+        try:
+            import_csv_to_sqlite(args.db_path, args.data_dir, force=args.force)
+        except ValueError as e:
+            print(f"Error: {e}; pass --force to replace it", file=sys.stderr)
+            return 1
+        print(f"Imported {args.data_dir or DATA_DIR}/ into {args.db_path}")
+        return 0
+
+    if args.command == "generate":
+        if os.path.exists(os.path.join(args.target, "inventory.csv")) and not args.force:
+            print(f"Error: {args.target}/ already holds data; pass --force to overwrite it", file=sys.stderr)
+            return 1
+        counts = generate(args.target, args.products, args.lines, args.days, args.seed)
+        print(f"Wrote {counts['products']} products and {counts['lines']} sale lines to {args.target}/")
+        return 0
+
+    if args.command == "bench":
+        if not (args.data_dir or args.db):
+            print("Error: bench writes bills, so point it at a generated data set with --data-dir or --db",
+                  file=sys.stderr)
+            return 1
+        try:
+            operations = args.only.split(",") if args.only else None
+            report = run_benchmarks(lambda: open_backend(args.backend, args.data_dir, args.db), operations,
+                                    args.repeat, args.label)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        write_results(report, args.output)
+        return 0
+
+    service = InventoryService(open_backend(args.backend, args.data_dir, args.db))
+    try:
+        if args.command == "bill":
+            print(format_receipt(service.sell(args.items, args.customer)))
+        elif args.command == "ingest":
+            result = service.ingest_bills(read_json_lines(args.path))
+            total = sum(bill["total"] for bill in result["accepted"])
+            print(f"Ingested {len(result['accepted'])} bills totalling ₹{total:.2f}.")
+            for reject in result["rejected"]:
+                print(f"  bill {reject['index'] + 1}: {reject['reason']}")
+            if result["rejected"]:
+                return 1
+        elif args.command == "restock":
+            service.restock(args.product_id, args.quantity)
+            print(f"Added {args.quantity} units.")
+        elif args.command == "import-delivery":
+            result = service.import_delivery(sys.stdin if args.path == "-" else args.path, args.chunksize)
+            print(format_import_report(result), end="")
+            if not result["rejected"].empty:
+                return 1
+        elif args.command == "report":
+            filename = service.export_report(args.report_type, args.output or f"{args.report_type}_report.csv",
+                                             args.start, args.end, args.compression)
+            print(f"Report exported as {filename}")
+        elif args.command == "reorder":
+            suppliers = read_suppliers(args.suppliers) if args.suppliers else None
+            plan = service.reorder_plan(args.lead_time, args.cover, suppliers, args.supplier)
+            if args.output:
+                plan.to_csv(args.output, index=False)
+            if plan.empty:
+                print("Nothing to reorder.")
+            print("\n".join(format_purchase_orders(plan, lead_time_days=args.lead_time).values()), end="")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
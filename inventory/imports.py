@@ -0,0 +1,80 @@
+"""Bulk stock and price updates from supplier delivery files."""
+import pandas as pd
+
+# Delivery files have a product_id column plus a quantity delta, a new price, or both
+DELIVERY_COLUMNS = ["product_id", "quantity", "price"]
+
+def _numeric(chunk, column):
+    text = chunk[column].str.strip() if column in chunk.columns else pd.Series("", index=chunk.index)
+    return pd.to_numeric(text, errors="coerce"), text != ""
+
+def read_delivery(store, source, chunksize=50_000):
+    """Stream a delivery file in chunks and validate it against the catalogue.
+
+    Returns per-product quantity deltas, per-product new prices (last one
+    wins) and a frame of rejected lines, without touching the store.
+    """
+    deltas, prices, rejected = [], [], []
+    known = store.all().index
+    line = 2
+    # Blank lines are read as empty rows so every row keeps its file line number
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False, skip_blank_lines=False):
+        if "product_id" not in chunk.columns:
+            raise ValueError("Delivery file needs a product_id column.")
+        lines = pd.Series(range(line, line + len(chunk)), index=chunk.index)
+        line += len(chunk)
+        blank = (chunk == "").all(axis=1)
+        chunk, lines = chunk[~blank], lines[~blank]
+        pid, _ = _numeric(chunk, "product_id")
+        qty, has_qty = _numeric(chunk, "quantity")
+        price, has_price = _numeric(chunk, "price")
+
+        reason = pd.Series("", index=chunk.index, dtype=object)
+        reason[~(has_qty | has_price)] = "no quantity or price"
+        reason[has_price & ~(price >= 0)] = "invalid price"
+        reason[has_qty & (qty % 1 != 0)] = "invalid quantity"
+        reason[~pid.isin(known)] = "unknown product_id"
+        reason[pid % 1 != 0] = "invalid product_id"
+        bad = reason != ""
+        rejected.append(pd.DataFrame({"line": lines[bad], "product_id": chunk["product_id"][bad], "reason": reason[bad]}))
+
+        ok_qty, ok_price = ~bad & has_qty, ~bad & has_price
+        deltas.append(qty[ok_qty].groupby(pid[ok_qty].astype("int64")).sum())
+        prices.append(price[ok_price].groupby(pid[ok_price].astype("int64")).last())
+
+    deltas = pd.concat(deltas).groupby(level=0).sum().astype("int64") if deltas else pd.Series(dtype="int64")
+    prices = pd.concat(prices).groupby(level=0).last() if prices else pd.Series(dtype="float64")
+    rejected = pd.concat(rejected, ignore_index=True) if rejected else pd.DataFrame(columns=["line", "product_id", "reason"])
+    return deltas, prices, rejected
+
+def import_delivery(store, source, chunksize=50_000):
+    """Apply a delivery file's quantity and price changes to the store in one commit"""
+    deltas, prices, rejected = read_delivery(store, source, chunksize)
+    if not len(deltas) and not len(prices):
+        return {"products": 0, "rejected": rejected}
+
+    # Checked by the store under its lock, against stock other tills may just have sold
+    negative = store.update_products(deltas, prices)
+    if len(negative):
+        rejected = pd.concat([rejected, pd.DataFrame({
+            "line": pd.NA,
+            "product_id": negative.astype(str),
+            "reason": "stock would go negative"
+        })], ignore_index=True)
+    return {
+        "products": len(deltas.index.union(prices.index).difference(negative)),
+        "rejected": rejected
+    }
+
+def format_import_report(result, limit=50):
+    rejected = result["rejected"]
+    report = f"Updated {result['products']} products.\n"
+    if rejected.empty:
+        return report
+    report += f"Rejected {len(rejected)} lines:\n"
+    for row in rejected.head(limit).itertuples(index=False):
+        where = f"line {row.line}" if not pd.isna(row.line) else "product"
+        report += f"  {where}: product_id {row.product_id!r} - {row.reason}\n"
+    if len(rejected) > limit:
+        report += f"  ... and {len(rejected) - limit} more\n"
+    return report
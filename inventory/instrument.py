@@ -0,0 +1,273 @@
+"""Opt-in timing, row counts and profiling for storage calls and UI actions."""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+
+import pandas as pd
+
+# Set INVENTORY_PROFILE=1 to time every instrumented call for the session.
+# The report goes to stderr at exit, or to INVENTORY_PROFILE_REPORT (text, or
+# JSON for a .json name). Nothing is wrapped unless enabled, so the normal
+# code paths pay no overhead at all.
+ENABLED = os.environ.get("INVENTORY_PROFILE", "") not in ("", "0")
+REPORT_PATH = os.environ.get("INVENTORY_PROFILE_REPORT")
+BUCKETS = 40
+
+class Histogram:
+    """Latencies of one call site in power-of-two microsecond buckets, plus rows handled"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds, rows=None, error=False):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if rows:
+            self.rows += rows
+        if error:
+            self.errors += 1
+        self.buckets[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Upper bound (seconds) of the bucket holding the q-quantile"""
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= q * self.count:
+                return min(2 ** i / 1e6, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "calls": self.count,
+            "rows": self.rows,
+            "errors": self.errors,
+            "total_s": round(self.total, 6),
+            "mean_ms": round(self.total / self.count * 1e3, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1e3, 3),
+            "p95_ms": round(self.percentile(0.95) * 1e3, 3),
+            "p99_ms": round(self.percentile(0.99) * 1e3, 3),
+            "max_ms": round(self.max * 1e3, 3),
+            # Bucket i counts calls that took less than 2**i microseconds
+            "buckets_us": {2 ** i: n for i, n in enumerate(self.buckets) if n}
+        }
+
+class Recorder:
+    """Per-call-site histograms for the session, and an on-demand cProfile.
+
+    cProfile only sees the thread it runs in, so while profiling each
+    instrumented call enables a profiler for its own thread (outermost call
+    only); stop_profile() merges them all into one pstats file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.started = time.time()
+        self.profiling = False
+        self.profilers = []
+        self.local = threading.local()
+
+    def record(self, name, seconds, rows=None, error=False):
+        with self.lock:
+            histogram = self.stats.get(name)
+            if histogram is None:
+                histogram = self.stats[name] = Histogram()
+            histogram.add(seconds, rows, error)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.started = time.time()
+
+    def _profile_enter(self):
+        if getattr(self.local, "depth", 0):
+            self.local.depth += 1
+            return None
+        profiler = getattr(self.local, "profiler", None)
+        if profiler is None:
+            profiler = self.local.profiler = cProfile.Profile()
+            with self.lock:
+                self.profilers.append(profiler)
+        self.local.depth = 1
+        profiler.enable()
+        return profiler
+
+    def _profile_exit(self, profiler):
+        # start_profile() may have swapped in a fresh thread-local mid-call
+        self.local.depth = max(0, getattr(self.local, "depth", 1) - 1)
+        if profiler is not None:
+            profiler.disable()
+
+    def start_profile(self):
+        with self.lock:
+            self.profilers = []
+            self.profiling = True
+        # Threads re-create their profiler on the next call
+        self.local = threading.local()
+
+    def stop_profile(self, path):
+        """Stop profiling and write the merged pstats file; returns its path, or None if nothing ran"""
+        with self.lock:
+            self.profiling = False
+            profilers, self.profilers = self.profilers, []
+        stats = None
+        for profiler in profilers:
+            profiler.create_stats()
+            if not profiler.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+        if stats is None:
+            return None
+        stats.dump_stats(path)
+        return path
+
+    def as_dict(self):
+        with self.lock:
+            stats = {name: histogram.as_dict() for name, histogram in self.stats.items()}
+        return {"started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                "seconds": round(time.time() - self.started, 3), "pid": os.getpid(), "calls": stats}
+
+    def report(self):
+        """Session report as text, slowest call sites (by total time) first"""
+        data = self.as_dict()
+        lines = [f"Session since {data['started']} ({data['seconds']:.0f}s), pid {data['pid']}",
+                 f"{'call':<42}{'calls':>7}{'rows':>10}{'total s':>9}{'mean ms':>9}{'p50 ms':>9}"
+                 f"{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for name, s in sorted(data["calls"].items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(f"{name[:41]:<42}{s['calls']:>7}{s['rows']:>10}{s['total_s']:>9.3f}{s['mean_ms']:>9.2f}"
+                         f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.as_dict(), f, indent=2)
+            else:
+                f.write(self.report())
+        return path
+
+recorder = Recorder()
+
+def row_count(args, result):
+    """Rows in the frame a call returned, else in the first frame it was given"""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            return len(arg)
+    return None
+
+def timed(fn, name, rows=row_count):
+    """Wrap fn so each call is recorded under name (and profiled while profiling is on)"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiling = recorder.profiling
+        profiler = recorder._profile_enter() if profiling else None
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            recorder.record(name, time.perf_counter() - start, error=True)
+            raise
+        finally:
+            if profiling:
+                recorder._profile_exit(profiler)
+        elapsed = time.perf_counter() - start
+        try:
+            count = rows(args, result) if rows else None
+        except Exception:
+            # Row counts are best effort; never fail the call being measured
+            count = None
+        recorder.record(name, elapsed, count)
+        return result
+    wrapper.instrumented = True
+    return wrapper
+
+def instrument(owner, names, prefix=None, rows=row_count):
+    """Replace owner's functions (class or module attributes, or a dict's items) with timed wrappers"""
+    if isinstance(owner, dict):
+        get, put = owner.get, owner.__setitem__
+        prefix = prefix or owner.get("__name__", "")
+    else:
+        get, put = lambda name: getattr(owner, name, None), lambda name, fn: setattr(owner, name, fn)
+        prefix = prefix or owner.__name__
+    for name in names:
+        fn = get(name)
+        if fn is not None and not getattr(fn, "instrumented", False):
+            put(name, timed(fn, f"{prefix}.{name}", rows))
+
+_installed = False
+
+def install():
+    """Instrument pandas I/O, the storage backends and the service layer (idempotent)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    from .analytics import SalesAggregates
+    from .search import BillIndex, NameIndex
+    from .service import InventoryService
+    from .storage import CsvBackend, SnapshotCache, SqliteBackend
+    from .store import InventoryStore
+
+    instrument(pd, ["read_csv", "read_sql_query"], "pandas")
+    instrument(pd.DataFrame, ["to_csv"], "pandas")
+    storage_calls = ["load_inventory", "save_inventory", "load_transactions", "save_transactions", "load_bills",
+                     "save_bills", "load_bill_ids", "load_reservations", "save_reservations",
+                     "commit", "changes", "history_changes", "compact", "recover"]
+    instrument(CsvBackend, storage_calls)
+    instrument(SqliteBackend, storage_calls)
+    instrument(SnapshotCache, ["load"])
+    instrument(InventoryStore, ["reload", "sync", "filter", "low_stock", "checkout", "update_products", "reserve"])
+    instrument(InventoryService, ["checkout", "ingest_bills", "restock", "import_delivery", "add_product",
+                                  "add_to_basket", "sync", "chart_data", "export_report",
+                                  "reorder_plan"])
+    instrument(SalesAggregates, ["rebuild", "record"])
+    instrument(BillIndex, ["_fold"], rows=None)
+    instrument(BillIndex, ["search"], rows=lambda args, result: len(result))
+    instrument(NameIndex, ["search"], rows=lambda args, result: len(result))
+
+    atexit.register(_report_at_exit)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        # kill -USR1 <pid> writes the report so far; kill -USR2 <pid> starts/stops a cProfile trace
+        signal.signal(signal.SIGUSR1, lambda signum, frame: _report_on_signal())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: toggle_profile())
+
+def toggle_profile(path=None):
+    """Start profiling, or stop and write the trace; returns the trace path once written"""
+    if not recorder.profiling:
+        recorder.start_profile()
+        print("Profiling started.", file=sys.stderr)
+        return None
+    path = recorder.stop_profile(path or f"inventory-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    print(f"Profile written to {path}." if path else "Profiling stopped; nothing ran.", file=sys.stderr)
+    return path
+
+def _report_on_signal():
+    path = recorder.dump(REPORT_PATH or f"inventory-{os.getpid()}-report.txt")
+    print(f"Report written to {path}.", file=sys.stderr)
+
+def _report_at_exit():
+    if recorder.profiling:
+        toggle_profile()
+    if REPORT_PATH:
+        recorder.dump(REPORT_PATH)
+    elif recorder.stats:
+        sys.stderr.write(recorder.report())
@@ -0,0 +1,64 @@
+"""Demand-based reorder suggestions for purchase orders."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Demand is the average daily units sold over this many days
+DEMAND_DAYS = 28
+# Days between ordering and delivery, and days of demand each order should cover
+LEAD_TIME_DAYS = 7
+COVER_DAYS = 14
+PLAN_COLUMNS = ["product_id", "name", "supplier", "quantity", "min_stock", "daily_demand", "days_of_cover",
+                "reorder_point", "order_qty", "price", "cost"]
+
+def demand_rates(daily, days=DEMAND_DAYS, now=None):
+    """Average units sold per day for each product over the last `days` full days, from a DailyRollup"""
+    today = (now or datetime.now()).date()
+    units = daily.units_by_product(today - timedelta(days=days), today)
+    return units / days
+
+def reorder_plan(catalogue, demand, lead_time_days=LEAD_TIME_DAYS, cover_days=COVER_DAYS, suppliers=None,
+                 default_supplier=""):
+    """Order lines for every product whose stock will not last through the lead time.
+
+    A product is reordered once its stock drops below the demand expected
+    before a delivery arrives plus its min_stock, and the order brings it
+    back up to that plus cover_days of demand. Products that never sell
+    fall back to topping up to min_stock. suppliers maps product_id to a
+    supplier name; unmapped products go to default_supplier. Computed over
+    the whole catalogue at once.
+    """
+    rate = demand.reindex(catalogue.index, fill_value=0).to_numpy(np.float64)
+    quantity = catalogue["quantity"].to_numpy(np.float64)
+    floor = catalogue["min_stock"].to_numpy(np.float64)
+    reorder_point = rate * lead_time_days + floor
+    target = reorder_point + rate * cover_days
+    order = np.where(quantity < reorder_point, np.ceil(target - quantity), 0).astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(rate > 0, quantity / rate, np.inf)
+
+    if suppliers is None:
+        supplier = pd.Series(default_supplier, index=catalogue.index)
+    else:
+        supplier = suppliers.reindex(catalogue.index).fillna(default_supplier)
+    plan = pd.DataFrame({
+        "product_id": catalogue["product_id"].to_numpy(),
+        "name": catalogue["name"].to_numpy(),
+        "supplier": supplier.to_numpy(),
+        "quantity": catalogue["quantity"].to_numpy(),
+        "min_stock": catalogue["min_stock"].to_numpy(),
+        "daily_demand": rate,
+        "days_of_cover": cover,
+        "reorder_point": np.ceil(reorder_point).astype(np.int64),
+        "order_qty": order,
+        "price": catalogue["price"].to_numpy()
+    })[order > 0]
+    plan["cost"] = plan["order_qty"] * plan["price"]
+    # Most urgent first within each supplier
+    return plan.sort_values(["supplier", "days_of_cover", "product_id"], ignore_index=True)
+
+def read_suppliers(source):
+    """product_id -> supplier Series from a CSV with product_id and supplier columns"""
+    df = pd.read_csv(source, usecols=["product_id", "supplier"], dtype={"supplier": str})
+    return df.drop_duplicates("product_id", keep="last").set_index("product_id")["supplier"]
@@ -0,0 +1,133 @@
+"""Report exports and purchase orders."""
+import gzip
+import io
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .reorder import LEAD_TIME_DAYS
+from .storage import BILL_COLUMNS, INVENTORY_COLUMNS, TRANSACTION_COLUMNS
+
+REPORT_TYPES = ("sales", "bills", "sales_by_product", "inventory")
+SALES_BY_PRODUCT_COLUMNS = ["product_id", "name", "quantity_sold", "revenue"]
+
+def format_purchase_order(lines, supplier, now=None, lead_time_days=LEAD_TIME_DAYS):
+    """One supplier's PO text from reorder plan lines (product_id, name, order_qty, price)"""
+    now = now or datetime.now()
+    delivery_date = (now + timedelta(days=lead_time_days)).strftime("%Y-%m-%d")
+    
+    po = f"{'PURCHASE ORDER':^40}\n"
+    po += f"{'-'*40}\n"
+    po += f"Date: {now.strftime('%Y-%m-%d')}\n"
+    po += f"Supplier: {supplier}\n"
+    po += f"Delivery By: {delivery_date}\n"
+    po += f"{'-'*40}\n"
+    po += f"{'ID':<5}{'Product':<20}{'Qty':>5}{'Price':>10}\n"
+    po += f"{'-'*40}\n"
+    
+    po += "".join(f"{pid:<5}{name[:18]:<20}{qty:>5}₹{price:>9.2f}\n"
+                  for pid, name, qty, price in zip(lines["product_id"], lines["name"], lines["order_qty"], lines["price"]))
+    total = float((lines["order_qty"] * lines["price"]).sum())
+    
+    po += f"{'-'*40}\n"
+    po += f"{'TOTAL:':<30}₹{total:>9.2f}\n"
+    po += f"{'-'*40}\n"
+    return po
+
+def format_purchase_orders(plan, now=None, lead_time_days=LEAD_TIME_DAYS):
+    """PO text per supplier for a whole reorder plan, as a {supplier: text} dict"""
+    return {supplier: format_purchase_order(lines, supplier, now, lead_time_days)
+            for supplier, lines in plan.groupby("supplier", sort=True)}
+
+# ==============================================
+# Report Export
+# ==============================================
+# History reports stream: rows are read, filtered and written one chunk at a
+# time, so memory stays flat however long the transaction log gets.
+def compression_for(filename):
+    if filename.endswith(".gz"):
+        return "gzip"
+    if filename.endswith(".zst"):
+        return "zstd"
+    return None
+
+def open_export(path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression needs the zstandard package.")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, "wb")), encoding="utf-8", newline="")
+    if compression is None:
+        return open(path, "w", newline="", encoding="utf-8")
+    raise ValueError(f"Unknown compression: {compression}")
+
+def in_range(stamps, start, end):
+    """Mask for "YYYY-MM-DD HH:MM" strings in [start, end); zero-padded stamps compare as text"""
+    mask = pd.Series(True, index=stamps.index)
+    if start is not None:
+        mask &= stamps >= start.strftime("%Y-%m-%d %H:%M")
+    if end is not None:
+        mask &= stamps < end.strftime("%Y-%m-%d %H:%M")
+    return mask
+
+def sales_chunks(service, start, end, chunksize):
+    for chunk in service.backend.iter_chunks("transactions", chunksize):
+        if start is not None or end is not None:
+            chunk = chunk[in_range(chunk["date"].astype(str) + " " + chunk["time"].astype(str), start, end)]
+        yield chunk
+
+def bill_chunks(service, start, end, chunksize):
+    for chunk in service.backend.iter_chunks("bills", chunksize):
+        if start is not None or end is not None:
+            chunk = chunk[in_range(chunk["date"].astype(str), start, end)]
+        yield chunk
+
+def sales_by_product(service, start, end, chunksize):
+    """Units sold per product in the range, valued at the catalogue price like the charts"""
+    units = pd.Series(dtype="int64")
+    for chunk in sales_chunks(service, start, end, chunksize):
+        units = units.add(chunk.groupby("product_id")["quantity_sold"].sum(), fill_value=0)
+    units = units.astype("int64")
+    prices = service.store.all()["price"].reindex(units.index).fillna(0)
+    report = pd.DataFrame({
+        "product_id": units.index,
+        "name": service.store.names_for(units.index),
+        "quantity_sold": units.to_numpy(),
+        "revenue": (units * prices).round(2).to_numpy()
+    })
+    yield report.sort_values("revenue", ascending=False, kind="stable")
+
+def export_report(service, report_type, filename, start=None, end=None, compression=None, chunksize=100_000):
+    """Write a report to filename, optionally limited to [start, end) and gzip/zstd compressed.
+
+    Compression defaults to whatever the filename's .gz/.zst suffix implies.
+    """
+    if report_type == "sales":
+        columns, chunks = TRANSACTION_COLUMNS, sales_chunks(service, start, end, chunksize)
+    elif report_type == "bills":
+        columns, chunks = BILL_COLUMNS, bill_chunks(service, start, end, chunksize)
+    elif report_type == "sales_by_product":
+        columns, chunks = SALES_BY_PRODUCT_COLUMNS, sales_by_product(service, start, end, chunksize)
+    elif report_type == "inventory":
+        inventory = service.store.all()
+        columns, chunks = INVENTORY_COLUMNS, (inventory.iloc[i:i + chunksize] for i in range(0, len(inventory), chunksize))
+    else:
+        raise ValueError("Invalid report type.")
+    tmp = filename + ".tmp"
+    try:
+        with open_export(tmp, compression or compression_for(filename)) as f:
+            header = True
+            for chunk in chunks:
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+            if header:
+                f.write(",".join(columns) + "\n")
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return filename
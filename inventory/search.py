@@ -0,0 +1,233 @@
+"""In-memory search indexes for product names and bill history."""
+import bisect
+import itertools
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .storage import concat_typed
+
+def trigram_keys(codes):
+    """Pack each run of three code points into one int64 key (21 bits per code point)"""
+    codes = codes.astype(np.int64)
+    return (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+
+def code_points(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+# Match classes, in result order: at the start of the name, at the start of a
+# later word, anywhere else
+PREFIX, WORD, OTHER = 0, 1, 2
+
+def match_class(name, query):
+    at = name.find(query)
+    if at <= 0:
+        return PREFIX if at == 0 else None
+    while at > 0 and name[at - 1].isalnum():
+        at = name.find(query, at + 1)
+    return WORD if at > 0 else OTHER
+
+def csr_postings(keys, rows, classes=None):
+    """CSR postings: sorted unique keys, offsets into the rows (and best class) per key.
+
+    keys must come in row order. Each key's rows stay in that order, or with
+    classes, are ordered by their best class and then by row.
+    """
+    if not len(keys):
+        return keys, np.zeros(1, dtype=np.int64), rows, classes
+    order = np.argsort(keys, kind="stable")
+    keys, rows = keys[order], rows[order]
+    keep = np.ones(len(keys), dtype=bool)
+    keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+    if classes is not None:
+        classes = np.minimum.reduceat(classes[order], np.flatnonzero(keep))
+    keys, rows = keys[keep], rows[keep]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    offsets = np.r_[starts, len(keys)]
+    if classes is not None:
+        group = np.repeat(np.arange(len(starts), dtype=np.int64), np.diff(offsets))
+        order = np.argsort(group * 3 + classes, kind="stable")
+        rows, classes = rows[order], classes[order]
+    return keys[starts], offsets, rows, classes
+
+class NameIndex:
+    """Case-folded n-gram index for literal substring search over product names.
+
+    Postings are stored CSR-style: sorted unique trigram keys, offsets into
+    one array of row positions. A query intersects the postings of its
+    trigrams (smallest first) and verifies the few candidates with str.find.
+    One- and two-character queries match too many names to verify, so their
+    unigram and bigram postings also carry each row's match class and are
+    answered without looking at the names. Names added after the build are
+    kept in a small list that is scanned.
+    """
+
+    def __init__(self, names):
+        self.folded = [str(name).casefold() for name in names]
+        self.indexed = len(self.folded)
+        codes = code_points("\x00".join(self.folded))
+        rows = np.repeat(np.arange(self.indexed, dtype=np.int32), [len(name) + 1 for name in self.folded])
+        # Short runs are keyed by dense character ranks rather than code
+        # points, so for the usual small alphabets they fit in 16 bits and
+        # sort with a radix sort
+        present = np.flatnonzero(np.bincount(codes))
+        self.rank = np.full(int(present[-1]) + 1 if len(present) else 1, -1, dtype=np.int64)
+        self.rank[present] = np.arange(len(present))
+        self.base = len(present)
+        dense = self.rank[codes]
+        # Class of a match starting at each code point, from the one before it
+        alnum = np.array([chr(c).isalnum() for c in present], dtype=bool)
+        classes = np.full(len(codes), PREFIX, dtype=np.int8)
+        classes[1:] = np.where(alnum[dense[:-1]], OTHER, WORD)
+        classes[1:][codes[:-1] == 0] = PREFIX
+        self.short = {}
+        for n in (1, 2, 3):
+            count = max(0, len(codes) - n + 1)
+            valid = np.ones(count, dtype=bool)
+            for k in range(n):
+                valid &= codes[k:k + count] != 0
+            if n < 3:
+                self.short[n] = csr_postings(self._short_keys(dense, n)[valid], rows[:count][valid],
+                                             classes[:count][valid])
+            else:
+                self.keys, self.offsets, self.postings, _ = csr_postings(trigram_keys(codes)[valid],
+                                                                         rows[:count][valid])
+
+    def _short_keys(self, dense, n):
+        dtype = np.uint16 if self.base ** n <= 1 << 16 else np.int64
+        dense = dense.astype(dtype)
+        return dense if n == 1 else dense[:-1] * dtype(self.base) + dense[1:]
+
+    def add(self, name):
+        self.folded.append(str(name).casefold())
+
+    def _postings(self, key):
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return self.postings[:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def search(self, query):
+        """Row positions whose name contains query, prefix matches first, then word starts"""
+        query = query.casefold()
+        if len(query) < 3:
+            return self._search_short(query)
+        lists = sorted((self._postings(key) for key in np.unique(trigram_keys(code_points(query)))), key=len)
+        candidates = lists[0]
+        for postings in lists[1:]:
+            # Once the candidate set is small, verifying beats further intersections
+            if len(candidates) < 512:
+                break
+            candidates = np.intersect1d(candidates, postings, assume_unique=True)
+        found = ([], [], [])
+        for pos in itertools.chain(candidates.tolist(), range(self.indexed, len(self.folded))):
+            cls = match_class(self.folded[pos], query)
+            if cls is not None:
+                found[cls].append(pos)
+        return np.array(found[PREFIX] + found[WORD] + found[OTHER], dtype=np.int64)
+
+    def _search_short(self, query):
+        if not query:
+            return np.arange(len(self.folded), dtype=np.int64)
+        keys, offsets, rows, classes = self.short[len(query)]
+        codes = code_points(query)
+        dense = self.rank[np.minimum(codes, len(self.rank) - 1)]
+        key = self._short_keys(dense, len(query))[0]
+        i = np.searchsorted(keys, key)
+        if (dense >= 0).all() and (codes < len(self.rank)).all() and i < len(keys) and keys[i] == key:
+            rows, classes = rows[offsets[i]:offsets[i + 1]], classes[offsets[i]:offsets[i + 1]]
+        else:
+            rows, classes = rows[:0], classes[:0]
+        added = [(pos, match_class(self.folded[pos], query)) for pos in range(self.indexed, len(self.folded))]
+        added = [(pos, cls) for pos, cls in added if cls is not None]
+        if not added:
+            return rows.astype(np.int64)
+        rows = np.r_[rows, [pos for pos, _ in added]]
+        classes = np.r_[classes, [cls for _, cls in added]]
+        return rows[np.argsort(classes, kind="stable")].astype(np.int64)
+
+def tokenize(text):
+    return re.findall(r"\w+", str(text).casefold())
+
+class BillIndex:
+    """Token index over bill history for the View Bills window.
+
+    Each searchable column is factorized once, and only its distinct values
+    are tokenized, so a query term resolves to a handful of value codes via
+    a binary search over the sorted tokens and then to rows with one
+    vectorized isin. New bills are queued by append() and folded in lazily.
+    Safe to append from one thread while another searches.
+    """
+
+    fields = ("bill_id", "customer", "product")
+
+    def __init__(self, bills):
+        self.bills = bills.iloc[:0]
+        self.dates = np.empty(0, dtype="datetime64[ns]")
+        self.codes = {field: np.empty(0, dtype=np.int64) for field in self.fields}
+        self.values = {field: {} for field in self.fields}
+        self.tokens = {field: {} for field in self.fields}
+        self.sorted_tokens = {field: [] for field in self.fields}
+        self.pending = [bills]
+        self.lock = threading.Lock()
+
+    def append(self, bills):
+        with self.lock:
+            self.pending.append(bills)
+
+    def _fold(self):
+        # Called with self.lock held
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        new = concat_typed(pending)
+        for field in self.fields:
+            values, tokens = self.values[field], self.tokens[field]
+            codes, uniques = pd.factorize(new[field], use_na_sentinel=False)
+            remap = np.empty(len(uniques), dtype=np.int64)
+            for i, value in enumerate(uniques):
+                value = str(value)
+                code = values.get(value)
+                if code is None:
+                    code = values[value] = len(values)
+                    for token in set(tokenize(value)):
+                        tokens.setdefault(token, []).append(code)
+                remap[i] = code
+            self.codes[field] = np.concatenate([self.codes[field], remap[codes]])
+            self.sorted_tokens[field] = sorted(tokens)
+        self.dates = np.concatenate([self.dates, pd.to_datetime(new["date"], errors="coerce").to_numpy()])
+        self.bills = concat_typed([self.bills, new]) if not self.bills.empty else new
+
+    def _term_mask(self, term):
+        mask = np.zeros(len(self.bills), dtype=bool)
+        for field in self.fields:
+            tokens, sorted_tokens = self.tokens[field], self.sorted_tokens[field]
+            codes = []
+            for i in range(bisect.bisect_left(sorted_tokens, term), len(sorted_tokens)):
+                if not sorted_tokens[i].startswith(term):
+                    break
+                codes.extend(tokens[sorted_tokens[i]])
+            if codes:
+                mask |= np.isin(self.codes[field], codes)
+        return mask
+
+    def search(self, query="", start=None, end=None):
+        """Row positions where every query word prefixes a bill ID, customer or product word,
+        optionally limited to dates in [start, end)"""
+        with self.lock:
+            self._fold()
+            mask = np.ones(len(self.bills), dtype=bool)
+            for term in tokenize(query):
+                mask &= self._term_mask(term)
+            if start is not None:
+                mask &= self.dates >= np.datetime64(start)
+            if end is not None:
+                mask &= self.dates < np.datetime64(end)
+        return np.flatnonzero(mask)
+
+    def columns(self, positions, names):
+        with self.lock:
+            bills = self.bills
+        return [bills[name].iloc[positions].to_numpy() for name in names]
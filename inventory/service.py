@@ -0,0 +1,176 @@
+"""Headless entry point shared by the GUI, the CLI and batch jobs."""
+import threading
+from datetime import date
+
+import pandas as pd
+
+from .analytics import SalesAggregates, chart_data
+from .billing import MAX_TILL, BillIdAllocator, build_bill, configured_till_id, line_item, prepare_batch, stock_deltas
+from .imports import import_delivery
+from .reorder import COVER_DAYS, DEMAND_DAYS, LEAD_TIME_DAYS, demand_rates, reorder_plan
+from .reports import export_report
+from .search import BillIndex
+from .storage import BILL_COLUMNS, TRANSACTION_COLUMNS, get_backend, typed_bills, typed_transactions
+from .store import InventoryStore
+
+class InventoryService:
+    """Owns the storage backend and the in-memory state built on top of it.
+
+    The catalogue is loaded up front; the sales aggregates, the bill index
+    and the bill-ID allocator are only built the first time something asks
+    for them. Commands that only touch stock never parse the history, but
+    the first sale or ingested batch reads every bill ID on file so new and
+    uploaded IDs can be checked for duplicates. Each is loaded under the
+    backend's lock, and sync() folds other tills' bills and sales into
+    whichever have been built since.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.backend.recover()
+        self.store = InventoryStore(self.backend)
+        self.lock = threading.Lock()
+        self._aggregates = None
+        self._bill_index = None
+        self._bill_ids = None
+        # Bills committed while the bill index is being built
+        self.record_lock = threading.Lock()
+        self._bills_recorded = None
+
+    @property
+    def aggregates(self):
+        with self.lock:
+            if self._aggregates is None:
+                with self.backend.exclusive():
+                    self._catch_up()
+                    txn = self.backend.load_transactions(typed=True)
+                self._aggregates = SalesAggregates(txn, self.store.all()["price"])
+            return self._aggregates
+
+    @property
+    def bill_index(self):
+        with self.lock:
+            if self._bill_index is None:
+                with self.record_lock:
+                    self._bills_recorded = []
+                with self.backend.exclusive():
+                    self._catch_up()
+                    bills = self.backend.load_bills(typed=True)
+                index = BillIndex(bills)
+                with self.record_lock:
+                    # A bill committed during the load may or may not be in it
+                    loaded = bills["bill_id"].cat.categories
+                    for rows in self._bills_recorded:
+                        rows = rows[~rows["bill_id"].isin(loaded)]
+                        if not rows.empty:
+                            index.append(rows)
+                    self._bills_recorded = None
+                    self._bill_index = index
+            return self._bill_index
+
+    @property
+    def bill_ids(self):
+        """Allocator for new bill IDs on this till's claimed number, seeded with every ID on file"""
+        with self.lock:
+            if self._bill_ids is None:
+                till = self.backend.claim_till(MAX_TILL + 1, configured_till_id())
+                with self.backend.exclusive():
+                    self._catch_up()
+                    self._bill_ids = BillIdAllocator(till, known=self.backend.load_bill_ids())
+            return self._bill_ids
+
+    def line_item(self, pid, qty):
+        return line_item(self.store, pid, qty)
+
+    def add_to_basket(self, basket, pid, qty):
+        """Price a line item and hold its stock for the basket; ValueError if the stock is gone"""
+        with self.store.lock, self.backend.exclusive():
+            self.store.sync()
+            # Priced first, so an item that cannot be sold never leaves a hold behind
+            item = self.line_item(pid, qty)
+            self.store.reserve(basket, pid, qty)
+        return item
+
+    def release_basket(self, basket):
+        self.store.release(basket)
+
+    def sync(self):
+        """Pick up stock changes, bills and sales made by other tills; True if any stock changed"""
+        changed = self.store.sync()
+        self._catch_up()
+        return changed
+
+    def _catch_up(self):
+        changes = self.backend.history_changes()
+        if self._bill_ids is not None:
+            self._bill_ids.known.update(changes["bills"]["bill_id"].astype(str))
+        self._record(changes["bills"], changes["transactions"])
+
+    def checkout(self, items, customer=None, now=None, basket=None):
+        """Commit a bill for already-priced line items and return it"""
+        bill = build_bill(items, customer, now, self.bill_ids.allocate())
+        self.store.checkout(bill["rows"], bill["sales"], bill["deltas"], basket)
+        self._record(bill["rows"], bill["sales"])
+        return bill
+
+    def ingest_bills(self, bills):
+        """Validate, allocate IDs for and commit a batch of offline bills in one pass"""
+        ids = self.bill_ids
+        with self.store.lock, self.backend.exclusive():
+            self.store.sync()
+            self._catch_up()
+            accepted, rejected = prepare_batch(self.store, bills, ids.known, ids.allocate, self.store.held())
+            rows = [row for bill in accepted for row in bill["rows"]]
+            sales = [sale for bill in accepted for sale in bill["sales"]]
+            if accepted:
+                self.store.checkout(rows, sales, stock_deltas(item for bill in accepted for item in bill["items"]))
+                ids.known.update(bill["bill_id"] for bill in accepted)
+        if accepted:
+            self._record(rows, sales)
+        return {"accepted": accepted, "rejected": rejected}
+
+    def _record(self, bill_rows, sales):
+        if self._aggregates is not None and len(sales):
+            self._aggregates.record(typed_transactions(pd.DataFrame(sales, columns=TRANSACTION_COLUMNS)),
+                                    self.store.all()["price"])
+        if not len(bill_rows):
+            return
+        with self.record_lock:
+            if self._bill_index is not None:
+                self._bill_index.append(typed_bills(pd.DataFrame(bill_rows, columns=BILL_COLUMNS)))
+            elif self._bills_recorded is not None:
+                self._bills_recorded.append(typed_bills(pd.DataFrame(bill_rows, columns=BILL_COLUMNS)))
+
+    def sell(self, quantities, customer=None, now=None):
+        """Price and commit a bill from (product_id, quantity) pairs"""
+        self.store.sync()
+        return self.checkout([self.line_item(pid, qty) for pid, qty in quantities], customer, now)
+
+    def restock(self, pid, qty):
+        if qty <= 0:
+            raise ValueError(f"Invalid quantity {qty}.")
+        if pid not in self.store:
+            raise ValueError("Product not found.")
+        self.store.adjust_quantities({pid: qty})
+
+    def import_delivery(self, source, chunksize=50_000):
+        return import_delivery(self.store, source, chunksize)
+
+    def add_product(self, name, quantity, price, min_stock):
+        return self.store.add_product(name, quantity, price, min_stock)
+
+    def reorder_plan(self, lead_time_days=LEAD_TIME_DAYS, cover_days=COVER_DAYS, suppliers=None,
+                     default_supplier="", now=None):
+        """Suggested order lines across the catalogue, driven by the last DEMAND_DAYS of sales"""
+        demand = demand_rates(self.aggregates.daily, DEMAND_DAYS, now)
+        return reorder_plan(self.store.all(), demand, lead_time_days, cover_days, suppliers, default_supplier)
+
+    def chart_version(self):
+        """Changes whenever any chart's data might: new sales, new products or a new day"""
+        return self.aggregates.version, len(self.store), date.today()
+
+    def chart_data(self, chart_type):
+        return chart_data(self.aggregates, self.store, chart_type)
+
+    def export_report(self, report_type, filename, start=None, end=None, compression=None):
+        return export_report(self, report_type, filename, start, end, compression)
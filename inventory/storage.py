@@ -0,0 +1,1012 @@
+"""Persistence for the inventory, transaction log and bill history."""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ==============================================
+# Data Management Functions
+# ==============================================
+INVENTORY_COLUMNS = ["product_id", "name", "quantity", "price", "min_stock"]
+TRANSACTION_COLUMNS = ["date", "time", "product_id", "quantity_sold"]
+BILL_COLUMNS = ["bill_id", "date", "product", "quantity", "price", "subtotal", "tax", "total", "customer"]
+RESERVATION_COLUMNS = ["basket", "product_id", "quantity", "expires"]
+# The append-only tables whose new rows history_changes() reports
+HISTORY_COLUMNS = {"bills": BILL_COLUMNS, "transactions": TRANSACTION_COLUMNS}
+
+# Storage backend: "csv" (default, files under data/) or "sqlite"
+BACKEND = os.environ.get("INVENTORY_BACKEND", "csv")
+DATA_DIR = os.environ.get("INVENTORY_DATA_DIR", "data")
+SQLITE_DB = os.environ.get("INVENTORY_DB", os.path.join(DATA_DIR, "inventory.db"))
+# Set INVENTORY_SNAPSHOTS=0 to always parse the CSVs
+SNAPSHOTS = os.environ.get("INVENTORY_SNAPSHOTS", "1") != "0"
+
+_backend = None
+
+def open_backend(kind=None, data_dir=None, db_path=None):
+    kind = kind or BACKEND
+    if kind == "sqlite":
+        return SqliteBackend(db_path or SQLITE_DB)
+    if kind == "csv":
+        return CsvBackend(data_dir or DATA_DIR)
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+def get_backend():
+    """The process-wide backend used by the load_*/save_* functions"""
+    global _backend
+    if _backend is None:
+        _backend = open_backend()
+    return _backend
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+def load_inventory():
+    return get_backend().load_inventory()
+
+def save_inventory(df):
+    get_backend().save_inventory(df)
+
+def load_transactions(typed=False):
+    return get_backend().load_transactions(typed)
+
+def save_transactions(df):
+    get_backend().save_transactions(df)
+
+def load_bills(typed=False):
+    return get_backend().load_bills(typed)
+
+def save_bills(df):
+    get_backend().save_bills(df)
+
+def fsync_dir(path):
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_csv_atomic(path, df):
+    """Write a whole CSV to a temp file and rename it over the original"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_dir(path)
+
+def read_csv_or_empty(path, columns):
+    try:
+        return pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=columns)
+
+def lock_file(f, blocking=True):
+    """Take an exclusive OS lock on an open file; False if blocking=False and it is held elsewhere"""
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    while True:
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.01)
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def claim_till(directory, count, till=None):
+    """Lock a till number under directory/tills for as long as the returned file stays open.
+
+    Takes the lowest free number below count, or exactly till if given.
+    The OS drops the lock when the process exits, so a crashed till frees
+    its number. Raises ValueError if no number (or not till) is free.
+    """
+    os.makedirs(os.path.join(directory, "tills"), exist_ok=True)
+    for number in range(count) if till is None else [till]:
+        handle = open(os.path.join(directory, "tills", f"{number}.lock"), "a+b")
+        if lock_file(handle, blocking=False):
+            return number, handle
+        handle.close()
+    if till is not None:
+        raise ValueError(f"Till {till} is already in use on this data.")
+    raise ValueError("Every till number is in use on this data; set INVENTORY_TILL_ID.")
+
+# ==============================================
+# Typed History
+# ==============================================
+# Loaded with typed=True, transactions and bills come back compact: repeated
+# text (bill IDs, products, customers) as categoricals, counts as int32, money
+# as int64 paise, and the date/time strings parsed once into a datetime64
+# "date" column (transactions lose their separate "time" column). Text is
+# factorized once and dates are parsed per distinct value rather than per row.
+MONEY_COLUMNS = ["price", "subtotal", "tax", "total"]
+
+def factorized(values):
+    """Integer codes (-1 for missing) and the distinct values they point at"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+def parse_dates(values, fmt):
+    codes, uniques = factorized(values)
+    parsed = pd.to_datetime(pd.Index(uniques).astype(str), format=fmt, errors="coerce").to_numpy()
+    # Code -1 (missing) picks the trailing NaT
+    return np.append(parsed, np.datetime64("NaT", "ns"))[codes]
+
+def parse_times(values):
+    codes, uniques = factorized(values)
+    parsed = pd.to_timedelta(pd.Index(uniques).astype(str) + ":00", errors="coerce").to_numpy()
+    parsed = np.append(parsed, np.timedelta64("NaT", "ns"))[codes]
+    parsed[np.isnat(parsed)] = 0
+    return parsed
+
+def as_category(values):
+    if not pd.api.types.is_string_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+        # e.g. numeric-looking legacy bill IDs
+        values = values.astype(str)
+    codes, uniques = factorized(values)
+    return pd.Categorical.from_codes(codes, pd.Index(uniques).astype(str))
+
+def narrow_int(values):
+    values = pd.to_numeric(values, errors="coerce")
+    return values.astype("int32") if values.between(-2**31, 2**31 - 1).all() else values
+
+def to_paise(values):
+    return np.rint(pd.to_numeric(values, errors="coerce").fillna(0).to_numpy(dtype=float) * 100).astype(np.int64)
+
+def typed_transactions(df):
+    return pd.DataFrame({
+        "date": parse_dates(df["date"], "%Y-%m-%d") + parse_times(df["time"]),
+        "product_id": narrow_int(df["product_id"]).to_numpy(),
+        "quantity_sold": narrow_int(df["quantity_sold"]).to_numpy()
+    })
+
+def typed_bills(df):
+    typed = pd.DataFrame({
+        "bill_id": as_category(df["bill_id"]),
+        "date": parse_dates(df["date"], "%Y-%m-%d %H:%M"),
+        "product": as_category(df["product"]),
+        "quantity": narrow_int(df["quantity"]).to_numpy()
+    })
+    for col in MONEY_COLUMNS:
+        typed[col] = to_paise(df[col])
+    typed["customer"] = as_category(df["customer"])
+    return typed
+
+def concat_typed(frames):
+    """Concatenate typed frames, merging categoricals instead of falling back to object columns"""
+    out = pd.concat(frames, ignore_index=True)
+    for col in out.columns:
+        parts = [frame[col] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts) and \
+                not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = union_categoricals(parts, ignore_order=True)
+    return out
+
+# ==============================================
+# Snapshot Cache
+# ==============================================
+# Parsed frames are kept under data/snapshots as one .npy file per column
+# (text as codes plus categories) and memory-mapped on the next load. A
+# snapshot is used as-is while its CSV has the same inode, size and mtime.
+# If the CSV has only grown - the normal case for the append-only
+# transaction log and bill history - just the new rows are parsed and folded
+# in. Anything else, or a snapshot that cannot be read, means a full parse.
+# Snapshots end at the last newline; a final row without one (a hand-edited
+# file, say) is parsed on every load, once no commit can be mid-append.
+SNAPSHOT_CHECK_BYTES = 4096
+
+class FileRange:
+    """File object limited to the next `remaining` bytes of f"""
+
+    def __init__(self, f, remaining):
+        self.f = f
+        self.remaining = remaining
+
+    def read(self, n=-1):
+        if n < 0 or n > self.remaining:
+            n = self.remaining
+        data = self.f.read(n)
+        self.remaining -= len(data)
+        return data
+
+def complete_lines_end(path, size):
+    """Offset just past the last newline before size, so a half-written row is never cached"""
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+def settled_size(f, settle):
+    """Size of open file f once any append in progress has finished, so a last row without a newline is whole"""
+    size = os.fstat(f.fileno()).st_size
+    if size:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            with settle():
+                size = os.fstat(f.fileno()).st_size
+        f.seek(0)
+    return size
+
+def prefix_digest(path, end):
+    with open(path, "rb") as f:
+        f.seek(max(0, end - SNAPSHOT_CHECK_BYTES))
+        return hashlib.sha1(f.read(min(end, SNAPSHOT_CHECK_BYTES))).hexdigest()
+
+class SnapshotCache:
+    def __init__(self, directory, settle):
+        self.directory = directory
+        # Context manager held by writers while they append to the CSVs
+        self.settle = settle
+        self.lock = threading.Lock()
+
+    def _path(self, name, generation, column, part):
+        return os.path.join(self.directory, f"{name}.{generation}.{column}.{part}.npy")
+
+    def _meta_path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, name, source, columns, convert, mmap=True):
+        """Frame for a CSV, where convert() turns freshly parsed rows into the cached form"""
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            return convert(pd.DataFrame(columns=columns))
+        try:
+            with open(self._meta_path(name)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        df = None
+        if meta and meta["ino"] == st.st_ino and meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns:
+            df = self._read(name, meta, mmap)
+            end = meta["end"]
+        if df is None:
+            df, end = self._refresh(name, source, columns, convert, mmap, meta, st)
+        if end == st.st_size:
+            return df
+        # Rows after the last newline stay out of the snapshot, but they are
+        # part of the file unless a commit is still writing them
+        tail = self._tail(source, st, end, columns)
+        if tail is None:
+            # Replaced while we were reading: start again
+            return self.load(name, source, columns, convert, mmap)
+        if tail.empty:
+            return df
+        return convert(tail) if end == 0 else concat_typed([df, convert(tail)])
+
+    def _refresh(self, name, source, columns, convert, mmap, meta, st):
+        """Snapshot brought up to the last complete line of source, and that line's end offset"""
+        end = complete_lines_end(source, st.st_size)
+        if meta and meta["ino"] == st.st_ino and 0 < meta["end"] <= end and \
+                prefix_digest(source, meta["end"]) == meta["digest"]:
+            cached = self._read(name, meta, mmap)
+            if cached is not None:
+                # Only touched (e.g. rewritten with the same rows): an empty
+                # tail would come back untyped and widen every column to object
+                df = cached if end == meta["end"] else \
+                    concat_typed([cached, convert(self._parse(source, meta["end"], end, columns))])
+                self._write(name, df, source, st, end)
+                return df, end
+        df = convert(self._parse(source, 0, end, columns))
+        self._write(name, df, source, st, end)
+        return df, end
+
+    def _tail(self, source, st, end, columns):
+        """Rows from end to EOF, read once no writer is part-way through them; None if source was replaced"""
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != st.st_ino:
+                return None
+            with self.settle():
+                f.seek(end)
+                data = io.BytesIO(f.read())
+        try:
+            if end == 0:
+                return pd.read_csv(data)
+            return pd.read_csv(data, header=None, names=columns)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame(columns=columns)
+
+    def _parse(self, source, start, end, columns):
+        with open(source, "rb") as f:
+            f.seek(start)
+            try:
+                if start == 0:
+                    return pd.read_csv(FileRange(f, end))
+                return pd.read_csv(FileRange(f, end - start), header=None, names=columns)
+            except pd.errors.EmptyDataError:
+                return pd.DataFrame(columns=columns)
+
+    def _read(self, name, meta, mmap):
+        mode = "r" if mmap else None
+        data = {}
+        try:
+            for column, kind in meta["columns"]:
+                if kind == "array":
+                    data[column] = np.load(self._path(name, meta["generation"], column, "values"), mmap_mode=mode)
+                    continue
+                codes = np.load(self._path(name, meta["generation"], column, "codes"), mmap_mode=mode)
+                categories = np.load(self._path(name, meta["generation"], column, "categories"))
+                values = pd.Categorical.from_codes(codes, pd.Index(categories, dtype=str))
+                data[column] = values if kind == "category" else pd.Series(values).astype(str).array
+        except (OSError, ValueError, KeyError):
+            return None
+        return pd.DataFrame(data, copy=not mmap)
+
+    def _write(self, name, df, source, st, end):
+        with self.lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                generation = os.urandom(4).hex()
+                columns = []
+                for column in df.columns:
+                    values = df[column]
+                    if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(values.dtype):
+                        kind = "category" if isinstance(values.dtype, pd.CategoricalDtype) else "text"
+                        codes, categories = factorized(values)
+                        np.save(self._path(name, generation, column, "codes"), codes)
+                        np.save(self._path(name, generation, column, "categories"),
+                                np.array(pd.Index(categories).astype(str).tolist(), dtype=str))
+                    else:
+                        kind = "array"
+                        np.save(self._path(name, generation, column, "values"), values.to_numpy())
+                    columns.append([column, kind])
+                meta = {"generation": generation, "columns": columns, "ino": st.st_ino, "size": st.st_size,
+                        "mtime_ns": st.st_mtime_ns, "end": end, "digest": prefix_digest(source, end)}
+                meta_path = self._meta_path(name)
+                with open(meta_path + ".tmp", "w") as f:
+                    json.dump(meta, f)
+                os.replace(meta_path + ".tmp", meta_path)
+                # Earlier generations go once the new one is in place (a reader
+                # that still has one mapped keeps its data on POSIX)
+                for entry in os.listdir(self.directory):
+                    if entry.startswith(name + ".") and entry.endswith(".npy") and \
+                            not entry.startswith(f"{name}.{generation}."):
+                        os.remove(os.path.join(self.directory, entry))
+            except OSError:
+                # The snapshot is only a cache; the CSV is still the source of truth
+                pass
+
+# ==============================================
+# CSV Backend
+# ==============================================
+# A checkout touches bills.csv, transactions.csv and the inventory journal.
+# Before any of them is appended to, the exact bytes for every file and each
+# file's current size are fsync'd to the WAL as one JSON record. If we crash
+# part-way, recovery truncates each file back to its recorded size and
+# replays the appends, so either all files get the rows or none do.
+#
+# Stock changes are appended to the journal as full, upserted product rows
+# rather than re-writing inventory.csv. Because each row carries the resulting
+# values (not a +/- delta), replaying the journal over any older snapshot is
+# idempotent, which keeps compaction safe to interrupt at any point.
+#
+# Several tills (processes) may share one data directory. Every write runs
+# inside exclusive(), which holds an OS lock on inventory.lock, and each
+# process remembers the journal's inode and how many bytes of it it has
+# read. changes() hands back the rows other tills appended since, so stock
+# is re-checked against the latest values before anything is committed. If
+# another till compacted the journal (a new inode), the catalogue is re-read.
+# The bill history and transaction log are tracked the same way, so each
+# till can fold the other tills' sales into its charts and bill search.
+class CsvBackend:
+    # Compact the inventory journal into inventory.csv once it holds this many rows
+    journal_compact_rows = 5000
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.inventory_file = os.path.join(data_dir, "inventory.csv")
+        self.inventory_journal = os.path.join(data_dir, "inventory.journal")
+        self.transactions_file = os.path.join(data_dir, "transactions.csv")
+        self.bills_file = os.path.join(data_dir, "bills.csv")
+        self.reservations_file = os.path.join(data_dir, "reservations.csv")
+        self.wal_file = os.path.join(data_dir, "checkout.wal")
+        self.lock_file = os.path.join(data_dir, "inventory.lock")
+        self.compact_lock_file = os.path.join(data_dir, "compact.lock")
+        self.snapshots = SnapshotCache(os.path.join(data_dir, "snapshots"), self.exclusive) if SNAPSHOTS else None
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.compacting = False
+        self.journal_rows = 0
+        # (inode, bytes read) of the journal as of this process's last look
+        self.journal_seen = (None, 0)
+        self.unseen = []
+        self.history_files = {"bills": self.bills_file, "transactions": self.transactions_file}
+        # (inode, bytes read) of each history file as of the last history_changes()
+        self.history_seen = {}
+        self.unseen_history = {table: [] for table in HISTORY_COLUMNS}
+        self.till = None
+
+    def claim_till(self, count, till=None):
+        """This process's till number on the shared data, held until the backend is dropped"""
+        if self.till is None:
+            self.till = claim_till(self.data_dir, count, till)
+        return self.till[0]
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the data directory against other threads and processes (re-entrant).
+
+        Yields True if a commit left half-done by a crashed process was
+        finished on the way in.
+        """
+        with self.lock:
+            recovered = False
+            if self.depth == 0:
+                handle = open(self.lock_file, "a+b")
+                lock_file(handle)
+                try:
+                    recovered = self._replay_wal()
+                except BaseException:
+                    unlock_file(handle)
+                    handle.close()
+                    raise
+            self.depth += 1
+            try:
+                yield recovered
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    unlock_file(handle)
+                    handle.close()
+
+    @contextmanager
+    def compaction(self, blocking=True):
+        """Held by whichever process is rewriting inventory.csv and the journal"""
+        with open(self.compact_lock_file, "a+b") as handle:
+            locked = lock_file(handle, blocking)
+            try:
+                yield locked
+            finally:
+                if locked:
+                    unlock_file(handle)
+
+    def _journal_stat(self, path=None):
+        try:
+            st = os.stat(path or self.inventory_journal)
+        except FileNotFoundError:
+            return None, 0
+        return st.st_ino, st.st_size
+
+    def _read_journal(self, start, end, path=None, columns=INVENTORY_COLUMNS):
+        with open(path or self.inventory_journal, "rb") as f:
+            f.seek(start)
+            data = io.BytesIO(f.read(end - start))
+        try:
+            if start == 0:
+                return pd.read_csv(data)
+            return pd.read_csv(data, header=None, names=columns)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame(columns=columns)
+
+    def _history_since(self, table, seen, st):
+        """Rows appended to a history file since seen, or None if there are none or it was replaced"""
+        if seen is None or st[1] <= seen[1] or (seen[0] != st[0] and seen[1] > 0):
+            return None
+        return self._read_journal(seen[1], st[1], self.history_files[table], HISTORY_COLUMNS[table])
+
+    def history_changes(self):
+        """Bill and transaction rows other processes appended since this one last looked.
+
+        Returns a dict of DataFrames keyed by table. The first call only
+        notes where each file ends.
+        """
+        changes = {}
+        with self.exclusive():
+            for table, columns in HISTORY_COLUMNS.items():
+                st = self._journal_stat(self.history_files[table])
+                frames, self.unseen_history[table] = self.unseen_history[table], []
+                rows = self._history_since(table, self.history_seen.get(table), st)
+                if rows is not None:
+                    frames.append(rows)
+                self.history_seen[table] = st
+                changes[table] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return changes
+
+    def changes(self):
+        """Inventory rows committed by other processes since this one last looked, or None"""
+        with self.exclusive():
+            ino, size = self._journal_stat()
+            seen_ino, offset = self.journal_seen
+            if ino == seen_ino and size == offset:
+                rows = None
+            elif ino is not None and ino == seen_ino and size > offset:
+                rows = self._read_journal(offset, size)
+            else:
+                # The journal was compacted or replaced: start again from the files
+                rows = self.load_inventory()
+            self.journal_seen = (ino, size)
+            pending, self.unseen = self.unseen, []
+        frames = pending + ([rows] if rows is not None else [])
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def _load_cached(self, name, path, columns, convert, mmap=True):
+        if self.snapshots is None:
+            return convert(read_csv_or_empty(path, columns))
+        return self.snapshots.load(name, path, columns, convert, mmap)
+
+    def load_inventory(self):
+        with self.exclusive():
+            # Not memory-mapped: the store edits this frame in place
+            df = self._load_cached("inventory", self.inventory_file, INVENTORY_COLUMNS, lambda df: df, mmap=False)
+            journal = read_csv_or_empty(self.inventory_journal, INVENTORY_COLUMNS)
+            self.journal_rows = len(journal)
+            self.journal_seen = self._journal_stat()
+            self.unseen = []
+        return replay_inventory_journal(df, journal)
+
+    def save_inventory(self, df):
+        with self.compaction(), self.exclusive():
+            write_csv_atomic(self.inventory_file, df)
+            if os.path.exists(self.inventory_journal):
+                os.remove(self.inventory_journal)
+            self.journal_rows = 0
+            self.journal_seen = (None, 0)
+
+    def load_transactions(self, typed=False):
+        if typed:
+            return self._load_cached("transactions", self.transactions_file, TRANSACTION_COLUMNS, typed_transactions)
+        return read_csv_or_empty(self.transactions_file, TRANSACTION_COLUMNS)
+
+    def save_transactions(self, df):
+        write_csv_atomic(self.transactions_file, df)
+
+    def load_bills(self, typed=False):
+        if typed:
+            return self._load_cached("bills", self.bills_file, BILL_COLUMNS, typed_bills)
+        return read_csv_or_empty(self.bills_file, BILL_COLUMNS)
+
+    def load_bill_ids(self):
+        if self.snapshots is not None:
+            return set(self.load_bills(typed=True)["bill_id"].cat.categories)
+        try:
+            return set(pd.read_csv(self.bills_file, usecols=["bill_id"], dtype=str)["bill_id"])
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return set()
+
+    def save_bills(self, df):
+        write_csv_atomic(self.bills_file, df)
+
+    def load_reservations(self):
+        return read_csv_or_empty(self.reservations_file, RESERVATION_COLUMNS)
+
+    def save_reservations(self, df):
+        write_csv_atomic(self.reservations_file, df[RESERVATION_COLUMNS])
+
+    def iter_chunks(self, table, chunksize=100_000):
+        """Raw rows of "transactions" or "bills" in chunks, as of the moment iteration starts"""
+        path = {"transactions": self.transactions_file, "bills": self.bills_file}[table]
+        try:
+            with open(path, "rb") as f:
+                with pd.read_csv(FileRange(f, settled_size(f, self.exclusive)), chunksize=chunksize) as reader:
+                    yield from reader
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return
+
+    def commit(self, bills=None, transactions=None, inventory=None):
+        """Append bill rows, transaction rows and upserted products as one crash-safe unit"""
+        appends = [(path, df) for path, df in (
+            (self.bills_file, bills),
+            (self.transactions_file, transactions),
+            (self.inventory_journal, inventory)
+        ) if df is not None and not df.empty]
+        with self.exclusive():
+            record = {"appends": [{
+                "path": path,
+                "offset": os.path.getsize(path) if os.path.exists(path) else 0,
+                "data": csv_payload(path, df)
+            } for path, df in appends]}
+            with open(self.wal_file, "w", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            fsync_dir(self.wal_file)
+            before = self._journal_stat()
+            for table, df in (("bills", bills), ("transactions", transactions)):
+                if df is not None and not df.empty and table in self.history_seen:
+                    # Keep other tills' rows from before ours for the next history_changes()
+                    path = self.history_files[table]
+                    rows = self._history_since(table, self.history_seen[table], self._journal_stat(path))
+                    if rows is not None:
+                        self.unseen_history[table].append(rows)
+            apply_wal_record(record)
+            os.remove(self.wal_file)
+            if inventory is not None:
+                self.journal_rows += len(inventory)
+                # Nobody else wrote in between, so our own rows need no re-reading
+                if before == self.journal_seen:
+                    self.journal_seen = self._journal_stat()
+            for table, df in (("bills", bills), ("transactions", transactions)):
+                if df is not None and not df.empty and table in self.history_seen:
+                    self.history_seen[table] = self._journal_stat(self.history_files[table])
+        self.maybe_compact()
+
+    def _replay_wal(self):
+        if not os.path.exists(self.wal_file):
+            return False
+        with open(self.wal_file, encoding="utf-8") as f:
+            text = f.read()
+        try:
+            record = json.loads(text)
+        except ValueError:
+            # The WAL record itself was torn, so none of the appends had started
+            record = None
+        if record is not None:
+            apply_wal_record(record)
+        os.remove(self.wal_file)
+        return record is not None
+
+    def recover(self):
+        """Finish or discard a commit interrupted by a crash; run before loading any data"""
+        with self.compaction(blocking=False) as idle:
+            # While another till is compacting, its .tmp files are still being written
+            if idle:
+                for path in (self.inventory_file, self.inventory_journal, self.transactions_file, self.bills_file):
+                    if os.path.exists(path + ".tmp"):
+                        os.remove(path + ".tmp")
+        with self.exclusive() as recovered:
+            return recovered
+
+    def maybe_compact(self):
+        if self.journal_rows >= self.journal_compact_rows and not self.compacting:
+            self.compacting = True
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """Fold the journal into inventory.csv without blocking commits while it is written"""
+        try:
+            with self.compaction(blocking=False) as locked:
+                if not locked:
+                    # Another till is already compacting
+                    return
+                with self.exclusive():
+                    if not os.path.exists(self.inventory_journal):
+                        return
+                    offset = os.path.getsize(self.inventory_journal)
+                    folded = self.journal_rows
+                # Only compaction rewrites the journal, so its first offset bytes are stable here
+                with open(self.inventory_journal, "rb") as f:
+                    journal = pd.read_csv(io.BytesIO(f.read(offset)))
+                base = read_csv_or_empty(self.inventory_file, INVENTORY_COLUMNS)
+                write_csv_atomic(self.inventory_file, replay_inventory_journal(base, journal))
+                with self.exclusive():
+                    # Other tills' rows this process has not read yet leave the journal
+                    # with the trim, so keep them for the next changes()
+                    ino, size = self._journal_stat()
+                    seen_ino, seen = self.journal_seen
+                    if ino == seen_ino and size > seen:
+                        self.unseen.append(self._read_journal(seen, size))
+                    trim_journal(self.inventory_journal, offset)
+                    self.journal_seen = self._journal_stat() if ino == seen_ino else (None, -1)
+                    self.journal_rows = max(0, self.journal_rows - folded)
+        finally:
+            self.compacting = False
+
+def csv_payload(path, df):
+    needs_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    data = df.to_csv(index=False, header=needs_header)
+    if not needs_header:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = "\n" + data
+    return data
+
+def apply_wal_record(record):
+    for entry in record["appends"]:
+        with open(entry["path"], "ab") as f:
+            if os.path.getsize(entry["path"]) > entry["offset"]:
+                f.truncate(entry["offset"])
+            f.write(entry["data"].encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+def replay_inventory_journal(df, journal):
+    if journal.empty:
+        return df
+    combined = pd.concat([df, journal]) if not df.empty else journal
+    order = combined.drop_duplicates("product_id", keep="first")["product_id"]
+    latest = combined.drop_duplicates("product_id", keep="last").set_index("product_id", drop=False)
+    return latest.loc[order].reset_index(drop=True)
+
+def trim_journal(path, offset):
+    """Drop the first offset bytes of journal rows once they are part of the snapshot"""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        if tail:
+            f.write(header + tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_dir(path)
+
+# ==============================================
+# SQLite Backend
+# ==============================================
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    product_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    min_stock INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity_sold INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_product_id ON transactions (product_id);
+CREATE TABLE IF NOT EXISTS bills (
+    bill_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    product TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    subtotal REAL NOT NULL,
+    tax REAL NOT NULL,
+    total REAL NOT NULL,
+    customer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bills_bill_id ON bills (bill_id);
+CREATE TABLE IF NOT EXISTS reservations (
+    basket TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+class SqliteBackend:
+    """Same interface as CsvBackend, backed by one SQLite database in WAL mode.
+
+    Stock changes are row-level upserts and bill rows go through a single
+    reused INSERT statement, so no commit ever rewrites a whole table. Each
+    upsert stamps its products with the next inventory version, which is how
+    one till finds the rows other tills changed since it last looked; new
+    bills and transactions are found by rowid.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.seen_version = 0
+        # Last rowid of each history table as of the last history_changes()
+        self.history_seen = {}
+        self.unseen_history = {table: [] for table in HISTORY_COLUMNS}
+        self.till = None
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        if "version" not in {row[1] for row in self.conn.execute("PRAGMA table_info(inventory)")}:
+            self.conn.execute("ALTER TABLE inventory ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS inventory_version ON inventory (version)")
+        self.conn.commit()
+
+    @contextmanager
+    def exclusive(self):
+        """One write transaction against other threads and processes (re-entrant)"""
+        with self.lock:
+            if self.depth == 0:
+                if self.conn.in_transaction:
+                    self.conn.commit()
+                self.conn.execute("BEGIN IMMEDIATE")
+            self.depth += 1
+            try:
+                yield False
+            except BaseException:
+                if self.depth == 1 and self.conn.in_transaction:
+                    self.conn.rollback()
+                raise
+            finally:
+                self.depth -= 1
+                if self.depth == 0 and self.conn.in_transaction:
+                    self.conn.commit()
+
+    def claim_till(self, count, till=None):
+        """This process's till number on the shared database, held until the backend is dropped"""
+        if self.till is None:
+            self.till = claim_till(os.path.dirname(os.path.abspath(self.path)), count, till)
+        return self.till[0]
+
+    def _next_version(self):
+        return self.conn.execute("SELECT coalesce(max(version), 0) + 1 FROM inventory").fetchone()[0]
+
+    def changes(self):
+        """Inventory rows committed by other processes since this one last looked, or None"""
+        with self.exclusive():
+            rows = pd.read_sql_query(f"SELECT {', '.join(INVENTORY_COLUMNS)}, version FROM inventory "
+                                     "WHERE version > ? ORDER BY version", self.conn, params=[self.seen_version])
+            if rows.empty:
+                return None
+            self.seen_version = int(rows["version"].max())
+        return rows[INVENTORY_COLUMNS]
+
+    def _last_rowid(self, table):
+        return self.conn.execute(f"SELECT coalesce(max(rowid), 0) FROM {table}").fetchone()[0]
+
+    def _history_since(self, table, seen, last):
+        if seen is None or last <= seen:
+            return None
+        return pd.read_sql_query(f"SELECT {', '.join(HISTORY_COLUMNS[table])} FROM {table} "
+                                 "WHERE rowid > ? AND rowid <= ? ORDER BY rowid", self.conn, params=[seen, last])
+
+    def history_changes(self):
+        """Bill and transaction rows other processes appended since this one last looked.
+
+        Returns a dict of DataFrames keyed by table. The first call only
+        notes where each table ends.
+        """
+        changes = {}
+        with self.exclusive():
+            for table, columns in HISTORY_COLUMNS.items():
+                last = self._last_rowid(table)
+                frames, self.unseen_history[table] = self.unseen_history[table], []
+                rows = self._history_since(table, self.history_seen.get(table), last)
+                if rows is not None:
+                    frames.append(rows)
+                self.history_seen[table] = last
+                changes[table] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return changes
+
+    def _load(self, table, columns):
+        with self.lock:
+            return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid", self.conn)
+
+    def _insert_sql(self, table, columns):
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    def _rows(self, df, columns):
+        return df[columns].itertuples(index=False, name=None)
+
+    def _replace(self, table, columns, df):
+        with self.exclusive():
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(self._insert_sql(table, columns), self._rows(df, columns))
+
+    def load_inventory(self):
+        with self.exclusive():
+            self.seen_version = self._next_version() - 1
+            return self._load("inventory", INVENTORY_COLUMNS)
+
+    def save_inventory(self, df):
+        with self.exclusive():
+            # Taken before the DELETE so other tills still see every row as changed
+            version = self._next_version()
+            self.conn.execute("DELETE FROM inventory")
+            self.conn.executemany(self._insert_sql("inventory", INVENTORY_COLUMNS + ["version"]),
+                                  (row + (version,) for row in self._rows(df, INVENTORY_COLUMNS)))
+            self.seen_version = version
+
+    def load_transactions(self, typed=False):
+        df = self._load("transactions", TRANSACTION_COLUMNS)
+        return typed_transactions(df) if typed else df
+
+    def save_transactions(self, df):
+        self._replace("transactions", TRANSACTION_COLUMNS, df)
+
+    def load_bills(self, typed=False):
+        df = self._load("bills", BILL_COLUMNS)
+        return typed_bills(df) if typed else df
+
+    def load_bill_ids(self):
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT DISTINCT bill_id FROM bills")}
+
+    def save_bills(self, df):
+        self._replace("bills", BILL_COLUMNS, df)
+
+    def load_reservations(self):
+        return self._load("reservations", RESERVATION_COLUMNS)
+
+    def save_reservations(self, df):
+        self._replace("reservations", RESERVATION_COLUMNS, df)
+
+    def iter_chunks(self, table, chunksize=100_000):
+        columns = {"transactions": TRANSACTION_COLUMNS, "bills": BILL_COLUMNS}[table]
+        # A separate connection reads one consistent WAL snapshot without holding up commits
+        conn = sqlite3.connect(self.path)
+        try:
+            yield from pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid", conn,
+                                         chunksize=chunksize)
+        finally:
+            conn.close()
+
+    def append(self, table, columns, df):
+        with self.exclusive():
+            self.conn.executemany(self._insert_sql(table, columns), self._rows(df, columns))
+
+    def commit(self, bills=None, transactions=None, inventory=None):
+        upsert = self._insert_sql("inventory", INVENTORY_COLUMNS + ["version"]) + \
+            " ON CONFLICT (product_id) DO UPDATE SET " + \
+            ", ".join(f"{col} = excluded.{col}" for col in INVENTORY_COLUMNS[1:] + ["version"])
+        with self.exclusive():
+            for table, df in (("bills", bills), ("transactions", transactions)):
+                if df is None:
+                    continue
+                if table in self.history_seen:
+                    # Keep other tills' rows from before ours for the next history_changes()
+                    rows = self._history_since(table, self.history_seen[table], self._last_rowid(table))
+                    if rows is not None:
+                        self.unseen_history[table].append(rows)
+                self.conn.executemany(self._insert_sql(table, HISTORY_COLUMNS[table]),
+                                      self._rows(df, HISTORY_COLUMNS[table]))
+                if table in self.history_seen:
+                    self.history_seen[table] = self._last_rowid(table)
+            if inventory is not None:
+                version = self._next_version()
+                self.conn.executemany(upsert, (row + (version,) for row in self._rows(inventory, INVENTORY_COLUMNS)))
+                # Nobody else wrote in between, so our own rows need no re-reading
+                if version == self.seen_version + 1:
+                    self.seen_version = version
+
+    def recover(self):
+        # SQLite rolls back or replays its own WAL when the database is opened
+        return False
+
+def import_csv_to_sqlite(db_path, data_dir=None, chunksize=100_000, force=False):
+    """One-shot import of the CSV data directory into a fresh SQLite database.
+
+    Raises ValueError if the database already holds data, unless force is
+    set, in which case its inventory, transactions and bills are replaced.
+    """
+    db = SqliteBackend(db_path)
+    filled = [table for table in ("inventory", "transactions", "bills")
+              if db.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()]
+    if filled and not force:
+        db.conn.close()
+        raise ValueError(f"{db_path} already holds {', '.join(filled)}")
+    csv = CsvBackend(data_dir or DATA_DIR)
+    csv.recover()
+    db.save_inventory(csv.load_inventory())
+    db.save_transactions(pd.DataFrame(columns=TRANSACTION_COLUMNS))
+    db.save_bills(pd.DataFrame(columns=BILL_COLUMNS))
+    for table, columns, path in (("transactions", TRANSACTION_COLUMNS, csv.transactions_file),
+                                 ("bills", BILL_COLUMNS, csv.bills_file)):
+        if os.path.exists(path):
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                db.append(table, columns, chunk)
+    return db
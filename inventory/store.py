@@ -0,0 +1,236 @@
+"""The long-lived in-memory inventory catalogue."""
+import threading
+import time
+
+import pandas as pd
+
+from .search import NameIndex
+from .storage import BILL_COLUMNS, RESERVATION_COLUMNS, TRANSACTION_COLUMNS, get_backend
+
+# Stock put in a basket is held this long (renewed whenever the basket grows)
+RESERVATION_SECONDS = 600
+
+class InventoryStore:
+    """Long-lived, in-memory copy of the catalogue indexed by product_id.
+
+    The catalogue is read once at startup; every read afterwards is served
+    from memory and every mutation is committed through the storage backend.
+    Other tills may share the backend, so each mutation first takes the
+    backend's exclusive lock and catches up on their changes with sync();
+    stock is then checked against the current values, not a stale copy.
+
+    The set of low-stock product IDs is kept alongside the catalogue and
+    updated from each committed row, so reading it never rescans every
+    product. Listeners added with subscribe() are told which IDs went low
+    and which recovered.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.lock = threading.RLock()
+        self.listeners = []
+        self.reload()
+
+    def reload(self):
+        with self.lock:
+            df = self.backend.load_inventory()
+            self.df = df.set_index("product_id", drop=False)
+            self.df.index.name = None
+            self.index = NameIndex(self.df["name"])
+            self.low = set(self.df.index[self.df["quantity"] < self.df["min_stock"]].tolist())
+
+    def __contains__(self, pid):
+        return pid in self.df.index
+
+    def __len__(self):
+        return len(self.df)
+
+    def get(self, pid):
+        return self.df.loc[pid]
+
+    def all(self):
+        return self.df
+
+    def filter(self, text):
+        if not text:
+            return self.df
+        return self.df.iloc[self.index.search(text)]
+
+    def low_stock(self):
+        """Rows of every product below its minimum stock, in product_id order"""
+        with self.lock:
+            return self.df.loc[sorted(self.low)]
+
+    def low_stock_count(self):
+        return len(self.low)
+
+    def subscribe(self, listener):
+        """Call listener(went_low, recovered) with sets of product IDs whenever the low-stock set changes.
+
+        Listeners run on the thread that committed the change, with the
+        store locked, so they should only record or hand off the news.
+        Returns a function that unsubscribes.
+        """
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def _track_low(self, rows):
+        below = rows["quantity"] < rows["min_stock"]
+        went_low = set(rows.index[below].tolist()) - self.low
+        recovered = set(rows.index[~below].tolist()) & self.low
+        if went_low or recovered:
+            self.low |= went_low
+            self.low -= recovered
+            for listener in list(self.listeners):
+                listener(went_low, recovered)
+
+    def names_for(self, pids):
+        """Vectorized product_id -> name lookup; IDs no longer in the catalogue get a placeholder"""
+        pids = pd.Series(pids)
+        names = pids.map(self.df["name"])
+        return names.where(names.notna(), "Product #" + pids.astype(str)).tolist()
+
+    def next_product_id(self):
+        return int(self.df["product_id"].max()) + 1 if not self.df.empty else 1
+
+    def sync(self):
+        """Fold in stock changes other tills committed since the last look; True if anything changed"""
+        with self.lock:
+            rows = self.backend.changes()
+            if rows is None or rows.empty:
+                return False
+            rows = rows.drop_duplicates("product_id", keep="last").set_index("product_id", drop=False)
+            rows.index.name = None
+            known = rows.index.isin(self.df.index)
+            if known.any():
+                self._apply(rows[known])
+            new = rows[~known]
+            if len(new):
+                self.df = pd.concat([self.df, new]) if not self.df.empty else new
+                self._track_low(new)
+                for name in new["name"]:
+                    self.index.add(name)
+            return True
+
+    def _holds(self):
+        holds = self.backend.load_reservations()
+        return holds[holds["expires"] > time.time()]
+
+    def held(self, exclude=None):
+        """Units held in open baskets (other than exclude), as a Series keyed by product_id"""
+        with self.lock, self.backend.exclusive():
+            holds = self._holds()
+        if exclude is not None:
+            holds = holds[holds["basket"] != exclude]
+        return holds.groupby("product_id")["quantity"].sum()
+
+    def reserve(self, basket, pid, qty):
+        """Hold qty more units of a product for a basket until it checks out or is released"""
+        if qty <= 0:
+            raise ValueError(f"Invalid quantity {qty}.")
+        with self.lock, self.backend.exclusive():
+            self.sync()
+            if pid not in self:
+                raise ValueError("Product not found.")
+            holds = self._holds()
+            available = int(self.get(pid)["quantity"]) - int(holds.loc[holds["product_id"] == pid, "quantity"].sum())
+            if qty > available:
+                raise ValueError(f"Only {max(available, 0)} units of product {pid} available.")
+            expires = time.time() + RESERVATION_SECONDS
+            holds = holds.copy()
+            holds.loc[holds["basket"] == basket, "expires"] = expires
+            hold = pd.DataFrame([[basket, pid, qty, expires]], columns=RESERVATION_COLUMNS)
+            self.backend.save_reservations(pd.concat([holds, hold], ignore_index=True) if len(holds) else hold)
+
+    def release(self, basket):
+        """Drop every hold a basket has (after checkout, or when it is cleared or closed)"""
+        with self.lock, self.backend.exclusive():
+            holds = self._holds()
+            self.backend.save_reservations(holds[holds["basket"] != basket])
+
+    def adjust_quantities(self, deltas):
+        with self.lock, self.backend.exclusive():
+            self.sync()
+            rows = self._updated_rows(deltas)
+            self.backend.commit(inventory=rows)
+            self._apply(rows)
+
+    def update_products(self, deltas, prices=None):
+        """Apply quantity deltas and new prices (Series keyed by product_id) in one commit.
+
+        Products whose stock the delta would take below zero, checked
+        against every till's latest commits, are left untouched (price
+        included); their product_ids are returned.
+        """
+        with self.lock, self.backend.exclusive():
+            self.sync()
+            negative = deltas.index[self.df.loc[deltas.index, "quantity"] + deltas < 0]
+            if len(negative):
+                deltas = deltas.drop(negative)
+                prices = prices.drop(negative, errors="ignore") if prices is not None else None
+            pids = deltas.index.union(prices.index) if prices is not None else deltas.index
+            if not len(pids):
+                return negative
+            rows = self.df.loc[pids].copy()
+            rows["quantity"] += deltas.reindex(pids, fill_value=0)
+            if prices is not None and len(prices):
+                rows.loc[prices.index, "price"] = prices
+            self.backend.commit(inventory=rows)
+            self._apply(rows)
+            return negative
+
+    def checkout(self, bill_rows, transaction_rows, deltas, basket=None):
+        """Record a bill, its sales and its stock decrements in one atomic commit.
+
+        Stock is re-checked against every till's latest commits, less what
+        other baskets hold, so two tills can never both sell the last unit.
+        The basket's own holds are released once the bill is on disk.
+        """
+        with self.lock, self.backend.exclusive():
+            self.sync()
+            holds = self._holds()
+            mine = holds["basket"] == basket
+            held = holds[~mine].groupby("product_id")["quantity"].sum()
+            for pid, delta in deltas.items():
+                available = int(self.get(pid)["quantity"]) - int(held.get(pid, 0))
+                if available + delta < 0:
+                    raise ValueError(f"Only {max(available, 0)} units of product {pid} available.")
+            rows = self._updated_rows(deltas)
+            self.backend.commit(
+                bills=pd.DataFrame(bill_rows, columns=BILL_COLUMNS),
+                transactions=pd.DataFrame(transaction_rows, columns=TRANSACTION_COLUMNS),
+                inventory=rows
+            )
+            self._apply(rows)
+            if mine.any():
+                self.backend.save_reservations(holds[~mine])
+
+    def add_product(self, name, quantity, price, min_stock):
+        with self.lock, self.backend.exclusive():
+            self.sync()
+            pid = self.next_product_id()
+            row = pd.DataFrame([{
+                "product_id": pid,
+                "name": name,
+                "quantity": quantity,
+                "price": price,
+                "min_stock": min_stock
+            }], index=[pid])
+            self.backend.commit(inventory=row)
+            self.df = pd.concat([self.df, row]) if not self.df.empty else row
+            self.index.add(name)
+            self._track_low(row)
+        return pid
+
+    def _updated_rows(self, deltas):
+        rows = self.df.loc[list(deltas)].copy()
+        rows["quantity"] += pd.Series(deltas)
+        return rows
+
+    def _apply(self, rows):
+        self.df.loc[rows.index, rows.columns] = rows
+        self._track_low(rows)
+
+    def save(self):
+        with self.lock:
+            self.backend.save_inventory(self.df)
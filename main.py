@@ -1,63 +1,228 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, filedialog, messagebox, simpledialog
 from tkinter.scrolledtext import ScrolledText
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import queue
 import uuid
 import webbrowser
 
+from inventory import instrument
+from inventory import (
+    CHART_TYPES,
+    REPORT_TYPES,
+    TAX_RATE,
+    InventoryService,
+    format_import_report,
+    format_purchase_orders,
+    format_receipt,
+)
+
 # ==============================================
-# Data Management Functions
+# Utility Functions
 # ==============================================
-def load_inventory():
-    try:
-        return pd.read_csv("data/inventory.csv")
-    except:
-        return pd.DataFrame(columns=["product_id", "name", "quantity", "price", "min_stock"])
+def refresh_inventory_table(filter_txt=""):
+    inv = service.store.filter(filter_txt)
+    inventory_tree.set_data([
+        inv["product_id"].to_numpy(),
+        inv["name"].to_numpy(),
+        inv["quantity"].to_numpy(),
+        inv["price"].to_numpy()
+    ])
 
-def save_inventory(df):
-    df.to_csv("data/inventory.csv", index=False)
+def show_low_stock_badge():
+    low = service.store.low_stock_count()
+    if low:
+        low_stock_btn.config(text=f"⚠️ Low Stock ({low})", style="Warning.TButton")
+    else:
+        low_stock_btn.config(text="Inventory Healthy", style="Safe.TButton")
 
-def load_transactions():
-    try:
-        return pd.read_csv("data/transactions.csv")
-    except:
-        return pd.DataFrame(columns=["date", "time", "product_id", "quantity_sold"])
+# ==============================================
+# Virtual Table
+# ==============================================
+class VirtualTreeview:
+    """Treeview that only materializes the rows currently in view.
 
-def save_transactions(df):
-    df.to_csv("data/transactions.csv", index=False)
+    Rows are kept as column arrays; a small pool of Tk items (one per visible
+    row) is re-filled with the visible slice whenever the table scrolls,
+    resizes or gets new data, so the item count never depends on the data size.
+    """
 
-def load_bills():
-    try:
-        return pd.read_csv("data/bills.csv")
-    except:
-        return pd.DataFrame(columns=["bill_id", "date", "product", "quantity", "price", "subtotal", "tax", "total", "customer"])
+    def __init__(self, parent, columns, formats=None, **kwargs):
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse", **kwargs)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.formats = formats or {}
+        self.data = [[] for _ in columns]
+        self.count = 0
+        self.offset = 0
+        self.items = []
+        self.selected = None
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3) or "break")
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        # The pool only holds the visible rows, so the keys move the selection over all of them
+        for key, rows in (("<Up>", lambda: -1), ("<Down>", lambda: 1),
+                          ("<Prior>", lambda: 1 - self.visible_rows()), ("<Next>", lambda: self.visible_rows() - 1),
+                          ("<Home>", lambda: -self.count), ("<End>", lambda: self.count)):
+            self.tree.bind(key, lambda e, rows=rows: self.move(rows()) or "break")
+
+    def heading(self, column, **kwargs):
+        self.tree.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        self.tree.column(column, **kwargs)
+
+    def pack(self, **kwargs):
+        self.tree.pack(side="left", fill="both", expand=True, **kwargs)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def set_data(self, columns):
+        """Replace the table contents with one sequence per column"""
+        self.data = columns
+        self.count = len(columns[0]) if columns else 0
+        self.selected = None
+        self.render()
+
+    def row(self, index):
+        return tuple(
+            self.formats[i](col[index]) if i in self.formats else col[index]
+            for i, col in enumerate(self.data)
+        )
 
-def save_bills(df):
-    df.to_csv("data/bills.csv", index=False)
+    def visible_rows(self):
+        height = self.tree.winfo_height()
+        bbox = self.tree.bbox(self.items[0]) if self.items else ""
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        else:
+            header, row_height = 25, 20
+        return max(1, (height - header) // row_height)
+
+    def render(self):
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, self.count - visible))
+        # One extra item fills the partially visible row at the bottom
+        shown = min(visible + 1, self.count - self.offset)
+        while len(self.items) < shown:
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > shown:
+            self.tree.delete(self.items.pop())
+        for i, item in enumerate(self.items):
+            self.tree.item(item, values=self.row(self.offset + i))
+        if self.selected is not None and self.offset <= self.selected < self.offset + shown:
+            self.tree.selection_set(self.items[self.selected - self.offset])
+        else:
+            self.tree.selection_set(())
+        if self.count:
+            self.scrollbar.set(self.offset / self.count, min(self.offset + visible, self.count) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+
+    def move(self, rows):
+        """Move the selection by rows, scrolling just far enough to keep it in view"""
+        if not self.count:
+            return
+        # With nothing selected yet, Down selects the first row in view
+        start = self.selected if self.selected is not None else self.offset - (rows > 0)
+        self.selected = max(0, min(start + rows, self.count - 1))
+        visible = self.visible_rows()
+        if self.selected < self.offset:
+            self.scroll(self.selected - self.offset)
+        elif self.selected >= self.offset + visible:
+            self.scroll(self.selected - self.offset - visible + 1)
+        else:
+            self.render()
+        self.tree.focus(self.items[self.selected - self.offset])
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.count)
+        elif args[0] == "scroll":
+            step = self.visible_rows() - 1 if args[2] == "pages" else 1
+            self.offset += int(args[1]) * max(1, step)
+        self.render()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected = self.offset + self.items.index(selection[0])
 
 # ==============================================
-# Utility Functions
+# Background Tasks
 # ==============================================
-def refresh_inventory_table(filter_txt=""):
-    for item in inventory_tree.get_children():
-        inventory_tree.delete(item)
-    inv = load_inventory()
-    if filter_txt:
-        inv = inv[inv["name"].str.contains(filter_txt, case=False)]
-    for _, row in inv.iterrows():
-        inventory_tree.insert("", "end", values=(row["product_id"], row["name"], row["quantity"], f"₹{row['price']:.2f}"))
+class TaskRunner:
+    """Runs blocking work off the Tk thread and hands the result back to it.
 
-def show_low_stock_badge():
-    inv = load_inventory()
-    low = inv[inv["quantity"] < inv["min_stock"]]
-    if not low.empty:
-        low_stock_btn.config(text=f"⚠️ Low Stock ({len(low)})", style="Warning.TButton")
-    else:
-        low_stock_btn.config(text="Inventory Healthy", style="Safe.TButton")
+    Tasks submitted with the same key run one at a time in submission order,
+    so e.g. every write to the data files is serialized; tasks without a key
+    share a small thread pool. Callbacks are queued by the workers and run on
+    the Tk thread, which polls the queue with root.after while work is pending.
+    Quiet tasks (background refreshes) do not count towards the busy state.
+    """
+
+    poll_ms = 30
+
+    def __init__(self, root, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.lanes = {}
+        self.results = queue.Queue()
+        self.pending = 0
+        self.busy = 0
+        self.polling = False
+
+    def submit(self, fn, *args, key=None, on_done=None, on_error=None, quiet=False):
+        if key is None:
+            executor = self.pool
+        else:
+            executor = self.lanes.get(key)
+            if executor is None:
+                executor = self.lanes[key] = ThreadPoolExecutor(max_workers=1)
+        self.pending += 1
+        if not quiet:
+            self.busy += 1
+            if self.busy == 1 and self.on_busy:
+                self.on_busy(True)
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error, quiet)))
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                future, on_done, on_error, quiet = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if not quiet:
+                self.busy -= 1
+                if self.busy == 0 and self.on_busy:
+                    self.on_busy(False)
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    messagebox.showerror("Error", str(error))
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+        if self.pending:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self.polling = False
 
 # ==============================================
 # Window Classes
@@ -68,8 +233,7 @@ class LowStockDialog:
         self.top.title("Low Stock Alert")
         self.top.geometry("500x400")
         
-        inv = load_inventory()
-        low_stock = inv[inv["quantity"] < inv["min_stock"]]
+        low_stock = service.store.low_stock()
         
         if low_stock.empty:
             label = ttk.Label(self.top, text="All products have sufficient stock.", padding=10)
@@ -93,15 +257,9 @@ class LowStockDialog:
             tree.column("Minimum", width=80, anchor="center")
             tree.column("Needed", width=80, anchor="center")
             
-            for _, row in low_stock.iterrows():
-                needed = row["min_stock"] - row["quantity"]
-                tree.insert("", "end", values=(
-                    row["product_id"],
-                    row["name"],
-                    row["quantity"],
-                    row["min_stock"],
-                    needed
-                ))
+            for values in zip(low_stock["product_id"], low_stock["name"], low_stock["quantity"],
+                              low_stock["min_stock"], low_stock["min_stock"] - low_stock["quantity"]):
+                tree.insert("", "end", values=values)
             
             scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
             tree.configure(yscrollcommand=scrollbar.set)
@@ -110,7 +268,7 @@ class LowStockDialog:
             scrollbar.pack(side="right", fill="y")
             
             ttk.Button(self.top, text="Generate Purchase Order", 
-                      command=lambda: generate_purchase_order(low_stock)).pack(pady=10)
+                      command=generate_purchase_order).pack(pady=10)
         
         ttk.Button(self.top, text="Close", command=self.top.destroy).pack(pady=10)
 
@@ -129,6 +287,9 @@ class BillingWindow:
         style.configure("Billing.TButton", font=("Arial", 10), padding=5)
         
         self.current_items = []
+        # Items added here are held in the shared store until checkout or release
+        self.basket = uuid.uuid4().hex
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
         
         # Header
         header_frame = ttk.Frame(self.top, style="Billing.TFrame")
@@ -188,56 +349,47 @@ class BillingWindow:
         btn_frame = ttk.Frame(self.top, style="Billing.TFrame")
         btn_frame.pack(pady=10, fill="x")
         
-        ttk.Button(btn_frame, text="Generate Bill", command=self.confirm_generate_bill, 
-                  style="Billing.TButton").pack(side="left", padx=5)
+        self.generate_btn = ttk.Button(btn_frame, text="Generate Bill", command=self.confirm_generate_bill, 
+                                       style="Billing.TButton")
+        self.generate_btn.pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Clear All", command=self.clear_all, 
                   style="Billing.TButton").pack(side="left", padx=5)
-        ttk.Button(btn_frame, text="Close", command=self.top.destroy, 
+        ttk.Button(btn_frame, text="Close", command=self.close, 
                   style="Billing.TButton").pack(side="right", padx=5)
     
+    def close(self):
+        tasks.submit(service.release_basket, self.basket, key="storage", quiet=True)
+        self.top.destroy()
+    
     def add_item(self):
         try:
             pid = int(self.product_id_entry.get())
             qty = int(self.quantity_entry.get())
-            inv = load_inventory()
-            
-            if pid not in inv["product_id"].values:
-                messagebox.showerror("Error", "Product not found.")
-                return
-            
-            product = inv[inv["product_id"] == pid].iloc[0]
-            
-            if product["quantity"] < qty:
-                messagebox.showerror("Error", f"Only {product['quantity']} units available.")
-                return
-            
-            subtotal = qty * product["price"]
-            
-            self.current_items.append({
-                "product_id": pid,
-                "name": product["name"],
-                "quantity": qty,
-                "price": product["price"],
-                "subtotal": subtotal
-            })
-            
-            self.bill_tree.insert("", "end", values=(
-                product["name"], 
-                qty, 
-                f"₹{product['price']:.2f}", 
-                f"₹{subtotal:.2f}"
-            ))
-            
-            self.calculate_totals()
-            self.product_id_entry.delete(0, tk.END)
-            self.quantity_entry.delete(0, tk.END)
-            
-        except Exception as e:
+        except ValueError as e:
             messagebox.showerror("Error", str(e))
+            return
+        # Reserving takes the shared lock, so it runs with the other writes
+        tasks.submit(service.add_to_basket, self.basket, pid, qty, key="storage", on_done=self.item_added)
+    
+    def item_added(self, item):
+        if not self.top.winfo_exists():
+            return
+        self.current_items.append(item)
+        
+        self.bill_tree.insert("", "end", values=(
+            item["name"], 
+            item["quantity"], 
+            f"₹{item['price']:.2f}", 
+            f"₹{item['subtotal']:.2f}"
+        ))
+        
+        self.calculate_totals()
+        self.product_id_entry.delete(0, tk.END)
+        self.quantity_entry.delete(0, tk.END)
     
     def calculate_totals(self):
         subtotal = sum(item["subtotal"] for item in self.current_items)
-        tax = subtotal * 0.05  # 5% tax
+        tax = subtotal * TAX_RATE
         total = subtotal + tax
         
         self.summary_label.config(
@@ -245,6 +397,10 @@ class BillingWindow:
         )
     
     def clear_all(self):
+        tasks.submit(service.release_basket, self.basket, key="storage", quiet=True)
+        self.reset()
+    
+    def reset(self):
         self.current_items = []
         self.bill_tree.delete(*self.bill_tree.get_children())
         self.customer_entry.delete(0, tk.END)
@@ -259,65 +415,28 @@ class BillingWindow:
             self.generate_bill()
     
     def generate_bill(self):
-        now = datetime.now()
-        bill_id = str(uuid.uuid4())[:8].upper()
-        subtotal = sum(item["subtotal"] for item in self.current_items)
-        tax = subtotal * 0.05
-        total = subtotal + tax
-        customer = self.customer_entry.get() or "Walk-in Customer"
-        
-        bills = load_bills()
-        
-        for item in self.current_items:
-            new_bill = {
-                "bill_id": bill_id,
-                "date": now.strftime("%Y-%m-%d %H:%M"),
-                "product": item["name"],
-                "quantity": item["quantity"],
-                "price": item["price"],
-                "subtotal": round(item["subtotal"], 2),
-                "tax": round(item["subtotal"] * 0.05, 2),
-                "total": round(item["subtotal"] * 1.05, 2),
-                "customer": customer
-            }
-            bills = pd.concat([bills, pd.DataFrame([new_bill])])
-        
-        save_bills(bills)
-        
-        # Update inventory
-        inv = load_inventory()
-        for item in self.current_items:
-            inv.loc[inv["product_id"] == item["product_id"], "quantity"] -= item["quantity"]
-        save_inventory(inv)
-        
+        items = list(self.current_items)
+        customer = self.customer_entry.get()
+        self.generate_btn.state(["disabled"])
+        tasks.submit(service.checkout, items, customer, None, self.basket, key="storage",
+                     on_done=self.show_receipt, on_error=self.on_bill_failed)
+    
+    def on_bill_failed(self, error):
+        if self.top.winfo_exists():
+            self.generate_btn.state(["!disabled"])
+        messagebox.showerror("Error", f"Bill was not saved: {error}")
+    
+    def show_receipt(self, bill):
         # Generate receipt
-        receipt_window = tk.Toplevel(self.top)
-        receipt_window.title(f"Receipt - {bill_id}")
+        parent = self.top if self.top.winfo_exists() else root
+        receipt_window = tk.Toplevel(parent)
+        receipt_window.title(f"Receipt - {bill['bill_id']}")
         receipt_window.geometry("400x600")
         
         receipt_text = ScrolledText(receipt_window, wrap=tk.WORD, font=("Courier", 10))
         receipt_text.pack(fill="both", expand=True)
         
-        receipt = f"{'INVOICE':^40}\n"
-        receipt += f"{'-'*40}\n"
-        receipt += f"Bill ID: {bill_id}\n"
-        receipt += f"Date: {now.strftime('%Y-%m-%d %H:%M')}\n"
-        receipt += f"Customer: {customer}\n"
-        receipt += f"{'-'*40}\n"
-        receipt += f"{'Item':<20}{'Qty':>5}{'Price':>10}{'Total':>10}\n"
-        receipt += f"{'-'*40}\n"
-        
-        for item in self.current_items:
-            receipt += f"{item['name'][:18]:<20}{item['quantity']:>5}₹{item['price']:>9.2f}₹{item['subtotal']:>9.2f}\n"
-        
-        receipt += f"{'-'*40}\n"
-        receipt += f"{'Subtotal:':<30}₹{subtotal:>9.2f}\n"
-        receipt += f"{'Tax (5%):':<30}₹{tax:>9.2f}\n"
-        receipt += f"{'-'*40}\n"
-        receipt += f"{'TOTAL:':<30}₹{total:>9.2f}\n"
-        receipt += f"{'-'*40}\n"
-        receipt += f"{'Thank you for shopping with us!':^40}\n"
-        
+        receipt = format_receipt(bill)
         receipt_text.insert(tk.END, receipt)
         receipt_text.config(state="disabled")
         
@@ -326,25 +445,180 @@ class BillingWindow:
         ttk.Button(receipt_window, text="Close", command=receipt_window.destroy,
                   style="Billing.TButton").pack(pady=5)
         
-        self.clear_all()
+        if self.top.winfo_exists():
+            # Checkout already released the basket's holds
+            self.reset()
+            self.generate_btn.state(["!disabled"])
         refresh_inventory_table()
         show_low_stock_badge()
 
+HEATMAP_ANNOTATE_CELLS = 200
+
+class ChartWindow:
+    """One embedded canvas reused for every chart.
+
+    Each chart type gets its own Axes on a single Figure. It is drawn the
+    first time that chart is shown; after that its artists only have their
+    data updated, and only when the data version changes. The last render of
+    each chart is kept as a bitmap, so switching back to an unchanged chart
+    is a blit. The figure never goes through pyplot, so closing the window
+    frees it.
+    """
+
+    def __init__(self, parent):
+        # Plotting libraries are only imported once a chart is first requested
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
+
+        self.top = tk.Toplevel(parent)
+        self.top.title("Charts")
+        self.top.geometry("900x600")
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.figure = Figure(figsize=(8, 5))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.top)
+        NavigationToolbar2Tk(self.canvas, self.top)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        
+        self.axes = {}
+        self.versions = {}
+        self.rendered = {}
+        self.current = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def show(self, chart_type, version, data):
+        if chart_type not in self.axes:
+            if chart_type == "Sales Heatmap":
+                # Heatmap plus a narrow colorbar column
+                self.axes[chart_type] = [self.figure.add_subplot(1, 20, (1, 19), label=chart_type),
+                                         self.figure.add_subplot(1, 20, 20, label=chart_type + " colorbar")]
+            else:
+                self.axes[chart_type] = [self.figure.add_subplot(label=chart_type)]
+        if self.versions.get(chart_type) != version:
+            self.draw(chart_type, data)
+            self.versions[chart_type] = version
+            self.rendered.pop(chart_type, None)
+        for name, axes in self.axes.items():
+            for ax in axes:
+                ax.set_visible(name == chart_type)
+        self.current = chart_type
+        cached = self.rendered.get(chart_type)
+        if cached is not None and cached[0] == tuple(self.figure.bbox.size):
+            self.canvas.restore_region(cached[1])
+            self.canvas.blit()
+        else:
+            self.figure.tight_layout()
+            self.canvas.draw()
+        self.top.title(chart_type)
+        self.top.deiconify()
+        self.top.lift()
+
+    def on_draw(self, event):
+        # Every full render (including zooms and resizes) refreshes the cached
+        # bitmap, so switching back to this chart is a single blit
+        if self.current is not None:
+            self.rendered[self.current] = (tuple(self.figure.bbox.size), self.canvas.copy_from_bbox(self.figure.bbox))
+
+    def draw(self, chart_type, data):
+        ax = self.axes[chart_type][0]
+        if chart_type == "Sales by Day":
+            self.update_bars(ax, data, "skyblue", "Sales by Day")
+        elif chart_type == "Top Products":
+            self.update_bars(ax, data, "C0", "Top Products")
+        elif chart_type == "Top Products by Revenue":
+            self.update_bars(ax, data, "seagreen", "Top Products by Revenue (₹)")
+        elif chart_type == "Top 20 by Revenue (90 Days)":
+            self.update_bars(ax, data.sort_values(), "seagreen", "Top 20 Products by Revenue, Last 90 Days (₹)",
+                             horizontal=True)
+        elif chart_type in ("Daily Sales (90 Days)", "Weekly Sales", "Monthly Sales"):
+            self.update_line(ax, data, chart_type)
+        elif chart_type == "Sales Heatmap":
+            self.update_heatmap(ax, self.axes[chart_type][1], data)
+
+    def update_bars(self, ax, data, color, title, horizontal=False):
+        values = data.to_numpy()
+        if ax.containers and len(ax.containers[0]) == len(values):
+            for bar, value in zip(ax.containers[0], values):
+                if horizontal:
+                    bar.set_width(value)
+                else:
+                    bar.set_height(value)
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            ax.clear()
+            (ax.barh if horizontal else ax.bar)(range(len(values)), values, color=color)
+            ax.set_title(title)
+        labels = [str(label) for label in data.index]
+        if horizontal:
+            ax.set_yticks(range(len(values)), labels)
+        else:
+            ax.set_xticks(range(len(values)), labels, rotation=45, ha="right")
+
+    def update_line(self, ax, data, title):
+        if ax.lines:
+            line = ax.lines[0]
+            line.set_data(data.index, data.to_numpy())
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            line, = ax.plot(data.index, data.to_numpy())
+            ax.set_title(title)
+            ax.set_ylabel("Units Sold")
+        line.set_marker("." if len(data) < 100 else "None")
+
+    def update_heatmap(self, ax, cax, data):
+        values = data.to_numpy()
+        images = ax.get_images()
+        if images and images[0].get_array().shape == values.shape:
+            image = images[0]
+            image.set_data(values)
+        else:
+            ax.clear()
+            cax.clear()
+            image = ax.imshow(values, aspect="auto", cmap="YlGnBu", interpolation="nearest")
+            self.figure.colorbar(image, cax=cax)
+            ax.set_title("Sales Heatmap")
+            ax.set_xlabel("Products")
+            ax.set_ylabel("Days of the Week")
+        # "Other" sums the whole tail, so it is left out of the colour scale
+        scaled = data.drop(columns="Other", errors="ignore").to_numpy()
+        low, high = (scaled.min(), scaled.max()) if scaled.size else (0, 1)
+        image.set_clim(low, max(high, low + 1))
+        ax.set_xticks(range(len(data.columns)), data.columns, rotation=45, ha="right")
+        ax.set_yticks(range(len(data.index)), data.index)
+        for text in list(ax.texts):
+            text.remove()
+        # Per-cell numbers only while they can still be read
+        if values.size <= HEATMAP_ANNOTATE_CELLS:
+            middle = (low + high) / 2
+            for i, row in enumerate(values.tolist()):
+                for j, value in enumerate(row):
+                    label = f"{value / 1000:.0f}k" if value >= 10000 else \
+                        f"{value / 1000:.1f}k" if value >= 1000 else str(value)
+                    ax.text(j, i, label, ha="center", va="center", fontsize=7,
+                            color="white" if value > middle else "black")
+
+    def close(self):
+        self.figure.clear()
+        self.top.destroy()
+
 # ==============================================
 # Main Functions
 # ==============================================
+def on_stock_changed(message):
+    messagebox.showinfo(*message)
+    refresh_inventory_table()
+    show_low_stock_badge()
+
 def add_stock_ui():
     try:
         pid = int(product_id_entry.get())
         qty = int(quantity_entry.get())
-        inv = load_inventory()
-
-        if pid in inv["product_id"].values:
-            inv.loc[inv["product_id"] == pid, "quantity"] += qty
-            save_inventory(inv)
-            messagebox.showinfo("Stock Updated", f"Added {qty} units.")
-            refresh_inventory_table()
-            show_low_stock_badge()
+
+        if pid in service.store:
+            tasks.submit(service.restock, pid, qty, key="storage",
+                         on_done=lambda _: on_stock_changed(("Stock Updated", f"Added {qty} units.")))
         else:
             messagebox.showerror("Error", "Product not found.")
     except Exception as e:
@@ -360,60 +634,85 @@ def add_new_product():
         price = float(simpledialog.askstring("Price", "Enter price:", initialvalue="0.00"))
         min_stock = int(simpledialog.askstring("Minimum Stock", "Enter minimum stock level:", initialvalue="5"))
 
-        inv = load_inventory()
-        pid = inv["product_id"].max() + 1 if not inv.empty else 1
-        inv = pd.concat([inv, pd.DataFrame([{
-            "product_id": pid, 
-            "name": name, 
-            "quantity": qty, 
-            "price": price,
-            "min_stock": min_stock
-        }])])
-        save_inventory(inv)
-        messagebox.showinfo("Success", f"{name} added.")
-        refresh_inventory_table()
-        show_low_stock_badge()
+        tasks.submit(service.add_product, name, qty, price, min_stock, key="storage",
+                     on_done=lambda _: on_stock_changed(("Success", f"{name} added.")))
     except:
         messagebox.showerror("Error", "Invalid input.")
 
+def import_delivery_ui():
+    path = filedialog.askopenfilename(title="Import Delivery",
+                                      filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+    tasks.submit(service.import_delivery, path, key="storage", on_done=show_import_report)
+
+def show_import_report(result):
+    refresh_inventory_table()
+    show_low_stock_badge()
+    
+    report_window = tk.Toplevel()
+    report_window.title("Delivery Import")
+    report_window.geometry("500x400")
+    
+    report_text = ScrolledText(report_window, wrap=tk.WORD, font=("Courier", 10))
+    report_text.pack(fill="both", expand=True, padx=10, pady=10)
+    report_text.insert(tk.END, format_import_report(result))
+    report_text.config(state="disabled")
+    
+    ttk.Button(report_window, text="Close", command=report_window.destroy).pack(pady=10)
+
+# Wait for a pause in typing before searching
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_HINT = "Search products..."
+search_job = None
+
 def on_search(event):
-    search_txt = search_entry.get()
-    refresh_inventory_table(search_txt)
+    global search_job
+    if search_job is not None:
+        root.after_cancel(search_job)
+    search_job = root.after(SEARCH_DEBOUNCE_MS, run_search)
+
+def run_search():
+    global search_job
+    search_job = None
+    refresh_inventory_table(search_entry.get())
+
+# Other tills may share the data directory; pick up their stock changes this often
+SYNC_MS = 5000
+
+def sync_stock():
+    tasks.submit(service.sync, key="storage", quiet=True, on_done=on_synced, on_error=on_synced)
+
+def on_synced(changed):
+    if changed is True:
+        text = search_entry.get()
+        refresh_inventory_table("" if text == SEARCH_HINT else text)
+        show_low_stock_badge()
+    root.after(SYNC_MS, sync_stock)
+
+chart_window = None
 
 def show_selected_chart():
-    txn = load_transactions()
-    inv = load_inventory()
-    txn["date"] = pd.to_datetime(txn["date"])
-    txn["day_of_week"] = txn["date"].dt.day_name()
     chart_type = chart_var.get()
+    tasks.submit(lambda: (service.chart_version(), service.chart_data(chart_type)), key="storage",
+                 on_done=lambda result: draw_chart(chart_type, *result))
+
+def draw_chart(chart_type, version, data):
+    global chart_window
+    if chart_window is None or not chart_window.top.winfo_exists():
+        chart_window = ChartWindow(root)
+    chart_window.show(chart_type, version, data)
 
-    plt.figure(figsize=(8, 5))
-    
-    if chart_type == "Sales by Day":
-        data = txn.groupby("day_of_week")["quantity_sold"].sum().reindex([
-            "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
-        ])
-        data.plot(kind="bar", color="skyblue", title="Sales by Day")
-    elif chart_type == "Top Products":
-        prod = txn.groupby("product_id")["quantity_sold"].sum()
-        prod.index = prod.index.map(lambda x: inv.loc[inv["product_id"] == x, "name"].values[0])
-        prod.sort_values(ascending=False).head(10).plot(kind="bar", title="Top Products")
-    elif chart_type == "Sales Heatmap":
-        pivot = txn.pivot_table(index="day_of_week", columns="product_id", values="quantity_sold", aggfunc="sum", fill_value=0)
-        pid_name_map = dict(zip(inv["product_id"], inv["name"]))
-        pivot.rename(columns=pid_name_map, inplace=True)
-        pivot = pivot.reindex(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
-        sns.heatmap(pivot, annot=True, fmt=".2f", cmap="YlGnBu")
-        plt.title("Sales Heatmap")
-        plt.xlabel("Products")
-        plt.ylabel("Days of the Week")
-    
-    plt.tight_layout()
-    plt.show()
+def parse_date_filter(text):
+    text = text.strip()
+    return datetime.strptime(text, "%Y-%m-%d") if text else None
 
 def view_bills():
-    bills = load_bills()
-    if bills.empty:
+    tasks.submit(lambda: service.bill_index.search(), key="bills",
+                 on_done=lambda positions: open_bills_window(service.bill_index, positions))
+
+def open_bills_window(index, positions):
+    if not len(positions):
         messagebox.showinfo("Info", "No bills found.")
         return
     
@@ -428,11 +727,24 @@ def view_bills():
     search_entry = ttk.Entry(search_frame)
     search_entry.pack(side="left", padx=5, fill="x", expand=True)
     
+    ttk.Label(search_frame, text="From:").pack(side="left")
+    from_entry = ttk.Entry(search_frame, width=11)
+    from_entry.pack(side="left", padx=5)
+    ttk.Label(search_frame, text="To:").pack(side="left")
+    to_entry = ttk.Entry(search_frame, width=11)
+    to_entry.pack(side="left", padx=5)
+    
+    status_label = ttk.Label(bills_window, text="")
+    status_label.pack(padx=10, anchor="w")
+    
     tree_frame = ttk.Frame(bills_window)
     tree_frame.pack(pady=10, padx=10, fill="both", expand=True)
     
     columns = ["Bill ID", "Date", "Customer", "Product", "Quantity", "Total"]
-    tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+    tree = VirtualTreeview(tree_frame, columns=columns, formats={
+        1: lambda date: str(date)[:16].replace("T", " "),
+        5: lambda paise: f"₹{paise / 100:.2f}"
+    })
     
     for col in columns:
         tree.heading(col, text=col)
@@ -442,76 +754,75 @@ def view_bills():
     tree.column("Customer", width=150)
     tree.column("Product", width=200)
     
-    scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
-    tree.configure(yscrollcommand=scrollbar.set)
+    tree.pack()
     
-    tree.pack(side="left", fill="both", expand=True)
-    scrollbar.pack(side="right", fill="y")
-    
-    def populate_tree(data):
-        tree.delete(*tree.get_children())
-        if data.empty:
-            messagebox.showinfo("Info", "No bills found.")
+    def on_search():
+        try:
+            start = parse_date_filter(from_entry.get())
+            end = parse_date_filter(to_entry.get())
+        except ValueError:
+            status_label.config(text="Dates must be YYYY-MM-DD")
             return
-        for _, row in data.iterrows():
-            tree.insert("", "end", values=(
-                row.get("bill_id", "N/A"),
-                row.get("date", "N/A"),
-                row.get("customer", "N/A"),
-                row.get("product", "N/A"),
-                row.get("quantity", "N/A"),
-                f"₹{row.get('total', 0):.2f}"
-            ))
-
-    
-    populate_tree(bills)
+        if end is not None:
+            end += timedelta(days=1)
+        positions = index.search(search_entry.get(), start, end)
+        tree.set_data(index.columns(positions, ["bill_id", "date", "customer", "product", "quantity", "total"]))
+        status_label.config(text=f"{len(positions)} bill lines" if len(positions) else "No bills match")
     
-    def on_search():
-        query = search_entry.get().lower()
-        if not query:
-            filtered = bills
-        else:
-            filtered = bills[
-                bills["bill_id"].str.contains(query, case=False) |
-                bills["customer"].str.contains(query, case=False) |
-                bills["product"].str.contains(query, case=False)
-            ]
-        populate_tree(filtered)
+    job = None
+    def schedule_search(event):
+        nonlocal job
+        if job is not None:
+            bills_window.after_cancel(job)
+        job = bills_window.after(SEARCH_DEBOUNCE_MS, on_search)
     
-    search_entry.bind("<KeyRelease>", lambda e: on_search())
+    for entry in (search_entry, from_entry, to_entry):
+        entry.bind("<KeyRelease>", schedule_search)
+    on_search()
     
     ttk.Button(bills_window, text="Close", command=bills_window.destroy).pack(pady=10)
 
 def export_report():
     try:
         report_type = simpledialog.askstring("Export Report", 
-                                           "Enter 'sales' for sales report or 'inventory' for inventory report:")
+                                           f"Report type ({', '.join(REPORT_TYPES)}):")
         if not report_type:
             return
             
-        if report_type == 'sales':
-            data = load_transactions()
-            filename = "sales_report.csv"
-        elif report_type == 'inventory':
-            data = load_inventory()
-            filename = "inventory_report.csv"
-        else:
+        report_type = report_type.strip().lower()
+        if report_type not in REPORT_TYPES:
             messagebox.showerror("Error", "Invalid report type.")
             return
         
-        data.to_csv(filename, index=False)
-        messagebox.showinfo("Success", f"Report exported as {filename}")
-        webbrowser.open(filename)
+        filename = filedialog.asksaveasfilename(
+            title="Export Report",
+            initialfile=f"{report_type}_report.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Gzipped CSV", "*.csv.gz"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        tasks.submit(service.export_report, report_type, filename, key=filename, on_done=report_exported)
     except Exception as e:
         messagebox.showerror("Error", str(e))
 
-def generate_purchase_order(low_stock):
-    now = datetime.now()
+def report_exported(filename):
+    messagebox.showinfo("Success", f"Report exported as {filename}")
+    if filename.endswith(".csv"):
+        webbrowser.open(filename)
+
+def generate_purchase_order():
     supplier = simpledialog.askstring("Purchase Order", "Enter supplier name:")
     if not supplier:
         return
-    
-    delivery_date = (now + timedelta(days=7)).strftime("%Y-%m-%d")
+    # Sizing orders reads the sales history, so keep it off the Tk thread
+    tasks.submit(service.reorder_plan, key="storage",
+                 on_done=lambda plan: show_purchase_order(plan.assign(supplier=supplier)))
+
+def show_purchase_order(plan):
+    if plan.empty:
+        messagebox.showinfo("Purchase Order", "Nothing needs reordering.")
+        return
     
     po_window = tk.Toplevel()
     po_window.title("Purchase Order")
@@ -520,25 +831,7 @@ def generate_purchase_order(low_stock):
     po_text = ScrolledText(po_window, wrap=tk.WORD, font=("Courier", 10))
     po_text.pack(fill="both", expand=True, padx=10, pady=10)
     
-    po = f"{'PURCHASE ORDER':^40}\n"
-    po += f"{'-'*40}\n"
-    po += f"Date: {now.strftime('%Y-%m-%d')}\n"
-    po += f"Supplier: {supplier}\n"
-    po += f"Delivery By: {delivery_date}\n"
-    po += f"{'-'*40}\n"
-    po += f"{'ID':<5}{'Product':<20}{'Qty':>5}{'Price':>10}\n"
-    po += f"{'-'*40}\n"
-    
-    total = 0
-    for _, row in low_stock.iterrows():
-        needed = row["min_stock"] - row["quantity"]
-        po += f"{row['product_id']:<5}{row['name'][:18]:<20}{needed:>5}₹{row['price']:>9.2f}\n"
-        total += needed * row["price"]
-    
-    po += f"{'-'*40}\n"
-    po += f"{'TOTAL:':<30}₹{total:>9.2f}\n"
-    po += f"{'-'*40}\n"
-    
+    po = "\n".join(format_purchase_orders(plan).values())
     po_text.insert(tk.END, po)
     po_text.config(state="disabled")
     
@@ -548,6 +841,77 @@ def generate_purchase_order(low_stock):
     ttk.Button(btn_frame, text="Print", command=lambda: print_receipt(po)).pack(side="left", padx=5)
     ttk.Button(btn_frame, text="Close", command=po_window.destroy).pack(side="left", padx=5)
 
+def set_busy(busy):
+    if busy:
+        progress_bar.pack(side="left")
+        progress_bar.start(10)
+    else:
+        progress_bar.stop()
+        progress_bar.pack_forget()
+
+def show_diagnostics(event=None):
+    """Session timing report with save, reset and cProfile controls (F12 when INVENTORY_PROFILE=1)"""
+    window = tk.Toplevel(root)
+    window.title("Diagnostics")
+    window.geometry("900x500")
+    
+    report_text = ScrolledText(window, wrap=tk.NONE, font=("Courier", 9))
+    report_text.pack(fill="both", expand=True, padx=10, pady=10)
+    
+    def refresh():
+        report_text.config(state="normal")
+        report_text.delete("1.0", tk.END)
+        report_text.insert(tk.END, instrument.recorder.report())
+        report_text.config(state="disabled")
+    
+    def save_report():
+        filename = filedialog.asksaveasfilename(parent=window, defaultextension=".txt",
+                                                filetypes=[("Text report", "*.txt"), ("JSON", "*.json")])
+        if filename:
+            instrument.recorder.dump(filename)
+    
+    def reset():
+        instrument.recorder.reset()
+        refresh()
+    
+    def toggle_profile():
+        if not instrument.recorder.profiling:
+            instrument.recorder.start_profile()
+            profile_btn.config(text="Stop Profiling")
+            return
+        filename = filedialog.asksaveasfilename(parent=window, defaultextension=".prof",
+                                                filetypes=[("cProfile stats", "*.prof")])
+        path = instrument.recorder.stop_profile(filename or f"inventory-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        profile_btn.config(text="Start Profiling")
+        messagebox.showinfo("Profile", f"Profile written to {path}" if path else "Nothing ran while profiling.",
+                            parent=window)
+    
+    btn_frame = ttk.Frame(window)
+    btn_frame.pack(pady=10)
+    ttk.Button(btn_frame, text="Refresh", command=refresh).pack(side="left", padx=5)
+    ttk.Button(btn_frame, text="Save Report", command=save_report).pack(side="left", padx=5)
+    ttk.Button(btn_frame, text="Reset", command=reset).pack(side="left", padx=5)
+    profile_btn = ttk.Button(btn_frame, text="Stop Profiling" if instrument.recorder.profiling else "Start Profiling",
+                             command=toggle_profile)
+    profile_btn.pack(side="left", padx=5)
+    ttk.Button(btn_frame, text="Close", command=window.destroy).pack(side="left", padx=5)
+    refresh()
+
+def instrument_ui():
+    """Time every handler, table refresh and chart render (only when INVENTORY_PROFILE is set)"""
+    instrument.install()
+    instrument.instrument(globals(), [
+        "refresh_inventory_table", "show_low_stock_badge", "add_stock_ui", "add_new_product", "import_delivery_ui",
+        "show_import_report", "run_search", "show_selected_chart", "draw_chart", "view_bills", "open_bills_window",
+        "export_report", "report_exported", "generate_purchase_order", "show_purchase_order", "on_stock_changed",
+        "on_synced"
+    ], "main")
+    instrument.instrument(VirtualTreeview, ["set_data", "render"], rows=lambda args, result: args[0].count)
+    instrument.instrument(LowStockDialog, ["__init__"])
+    instrument.instrument(BillingWindow, ["__init__", "add_item", "item_added", "generate_bill", "show_receipt",
+                                          "clear_all", "close"])
+    instrument.instrument(ChartWindow, ["__init__", "show", "draw"])
+
 def print_receipt(content):
     """Simulate printing by saving to a text file and opening it"""
     filename = f"receipt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
@@ -558,106 +922,113 @@ def print_receipt(content):
 # ==============================================
 # Main Application
 # ==============================================
-root = tk.Tk()
-root.title("Python Inventory System")
-root.geometry("800x700")
-root.configure(bg="#f5f5f5")
-
-# Configure styles
-style = ttk.Style()
-style.configure("TFrame", background="#f5f5f5")
-style.configure("TLabel", background="#f5f5f5", font=("Arial", 10))
-style.configure("TButton", font=("Arial", 10), padding=5)
-style.configure("Warning.TButton", foreground="red", font=("Arial", 10, "bold"))
-style.configure("Safe.TButton", foreground="green", font=("Arial", 10))
-style.configure("Header.TLabel", font=("Arial", 14, "bold"))
-
-# Header Frame
-header_frame = ttk.Frame(root, padding=10)
-header_frame.pack(fill="x")
-
-ttk.Label(header_frame, text="Python Inventory System", style="Header.TLabel").pack(side="left")
-ttk.Label(header_frame, text=f"Date: {datetime.today().strftime('%Y-%m-%d')}", 
-          style="TLabel").pack(side="right")
-
-# Input Frame
-input_frame = ttk.Frame(root, padding=10)
-input_frame.pack(fill="x")
-
-ttk.Label(input_frame, text="Product ID:").grid(row=0, column=0, padx=5)
-product_id_entry = ttk.Entry(input_frame)
-product_id_entry.grid(row=0, column=1, padx=5)
-
-ttk.Label(input_frame, text="Quantity:").grid(row=0, column=2, padx=5)
-quantity_entry = ttk.Entry(input_frame)
-quantity_entry.grid(row=0, column=3, padx=5)
-
-# Button Frame
-button_frame = ttk.Frame(root, padding=10)
-button_frame.pack(fill="x")
-
-ttk.Button(button_frame, text="New Bill", command=lambda: BillingWindow(root)).pack(side="left", padx=5)
-ttk.Button(button_frame, text="Add Stock", command=add_stock_ui).pack(side="left", padx=5)
-ttk.Button(button_frame, text="New Product", command=add_new_product).pack(side="left", padx=5)
-low_stock_btn = ttk.Button(button_frame, text="Inventory Healthy", style="Safe.TButton", 
-                          command=lambda: LowStockDialog(root))
-low_stock_btn.pack(side="left", padx=5)
-
-# Search Frame
-search_frame = ttk.Frame(root, padding=10)
-search_frame.pack(fill="x")
-
-search_entry = ttk.Entry(search_frame)
-search_entry.pack(side="left", padx=5, fill="x", expand=True)
-search_entry.insert(0, "Search products...")
-search_entry.bind("<KeyRelease>", on_search)
-
-# Inventory Tree Frame
-tree_frame = ttk.Frame(root)
-tree_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-inventory_tree = ttk.Treeview(tree_frame, columns=("ID", "Name", "Quantity", "Price"), show="headings")
-inventory_tree.heading("ID", text="ID")
-inventory_tree.heading("Name", text="Product Name")
-inventory_tree.heading("Quantity", text="Quantity")
-inventory_tree.heading("Price", text="Price")
-
-inventory_tree.column("ID", width=50, anchor="center")
-inventory_tree.column("Name", width=200)
-inventory_tree.column("Quantity", width=100, anchor="center")
-inventory_tree.column("Price", width=100, anchor="center")
-
-scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=inventory_tree.yview)
-inventory_tree.configure(yscrollcommand=scrollbar.set)
-
-inventory_tree.pack(side="left", fill="both", expand=True)
-scrollbar.pack(side="right", fill="y")
-
-# Chart Controls
-chart_frame = ttk.Frame(root, padding=10)
-chart_frame.pack(fill="x")
-
-chart_var = tk.StringVar()
-chart_options = ["Sales by Day", "Top Products", "Sales Heatmap"]
-chart_menu = ttk.Combobox(chart_frame, textvariable=chart_var, values=chart_options, state="readonly")
-chart_menu.set("Sales by Day")
-chart_menu.pack(side="left", padx=5)
-
-ttk.Button(chart_frame, text="Show Chart", command=show_selected_chart).pack(side="left", padx=5)
-ttk.Button(chart_frame, text="View Bills", command=view_bills).pack(side="left", padx=5)
-ttk.Button(chart_frame, text="Export Report", command=export_report).pack(side="left", padx=5)
-
-# Footer
-footer_frame = ttk.Frame(root, padding=10)
-footer_frame.pack(fill="x", side="bottom")
-
-ttk.Label(footer_frame, text=f"© {datetime.today().year} Python Inventory System", 
-          style="TLabel").pack(side="right")
-
-# Initial setup
-refresh_inventory_table()
-show_low_stock_badge()
-
-root.mainloop()
-
-                                
\ No newline at end of file
+if __name__ == "__main__":
+    if instrument.ENABLED:
+        instrument_ui()
+    service = InventoryService()
+
+    root = tk.Tk()
+    root.title("Python Inventory System")
+    root.geometry("800x700")
+    root.configure(bg="#f5f5f5")
+
+    # Configure styles
+    style = ttk.Style()
+    style.configure("TFrame", background="#f5f5f5")
+    style.configure("TLabel", background="#f5f5f5", font=("Arial", 10))
+    style.configure("TButton", font=("Arial", 10), padding=5)
+    style.configure("Warning.TButton", foreground="red", font=("Arial", 10, "bold"))
+    style.configure("Safe.TButton", foreground="green", font=("Arial", 10))
+    style.configure("Header.TLabel", font=("Arial", 14, "bold"))
+
+    # Header Frame
+    header_frame = ttk.Frame(root, padding=10)
+    header_frame.pack(fill="x")
+
+    ttk.Label(header_frame, text="Python Inventory System", style="Header.TLabel").pack(side="left")
+    ttk.Label(header_frame, text=f"Date: {datetime.today().strftime('%Y-%m-%d')}", 
+              style="TLabel").pack(side="right")
+
+    # Input Frame
+    input_frame = ttk.Frame(root, padding=10)
+    input_frame.pack(fill="x")
+
+    ttk.Label(input_frame, text="Product ID:").grid(row=0, column=0, padx=5)
+    product_id_entry = ttk.Entry(input_frame)
+    product_id_entry.grid(row=0, column=1, padx=5)
+
+    ttk.Label(input_frame, text="Quantity:").grid(row=0, column=2, padx=5)
+    quantity_entry = ttk.Entry(input_frame)
+    quantity_entry.grid(row=0, column=3, padx=5)
+
+    # Button Frame
+    button_frame = ttk.Frame(root, padding=10)
+    button_frame.pack(fill="x")
+
+    ttk.Button(button_frame, text="New Bill", command=lambda: BillingWindow(root)).pack(side="left", padx=5)
+    ttk.Button(button_frame, text="Add Stock", command=add_stock_ui).pack(side="left", padx=5)
+    ttk.Button(button_frame, text="New Product", command=add_new_product).pack(side="left", padx=5)
+    ttk.Button(button_frame, text="Import Delivery", command=import_delivery_ui).pack(side="left", padx=5)
+    low_stock_btn = ttk.Button(button_frame, text="Inventory Healthy", style="Safe.TButton", 
+                              command=lambda: LowStockDialog(root))
+    low_stock_btn.pack(side="left", padx=5)
+
+    # Search Frame
+    search_frame = ttk.Frame(root, padding=10)
+    search_frame.pack(fill="x")
+
+    search_entry = ttk.Entry(search_frame)
+    search_entry.pack(side="left", padx=5, fill="x", expand=True)
+    search_entry.insert(0, SEARCH_HINT)
+    search_entry.bind("<KeyRelease>", on_search)
+
+    # Inventory Tree Frame
+    tree_frame = ttk.Frame(root)
+    tree_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+    inventory_tree = VirtualTreeview(tree_frame, columns=("ID", "Name", "Quantity", "Price"),
+                                     formats={3: lambda price: f"₹{price:.2f}"})
+    inventory_tree.heading("ID", text="ID")
+    inventory_tree.heading("Name", text="Product Name")
+    inventory_tree.heading("Quantity", text="Quantity")
+    inventory_tree.heading("Price", text="Price")
+
+    inventory_tree.column("ID", width=50, anchor="center")
+    inventory_tree.column("Name", width=200)
+    inventory_tree.column("Quantity", width=100, anchor="center")
+    inventory_tree.column("Price", width=100, anchor="center")
+
+    inventory_tree.pack()
+
+    # Chart Controls
+    chart_frame = ttk.Frame(root, padding=10)
+    chart_frame.pack(fill="x")
+
+    chart_var = tk.StringVar()
+    chart_menu = ttk.Combobox(chart_frame, textvariable=chart_var, values=CHART_TYPES, state="readonly")
+    chart_menu.set("Sales by Day")
+    chart_menu.pack(side="left", padx=5)
+
+    ttk.Button(chart_frame, text="Show Chart", command=show_selected_chart).pack(side="left", padx=5)
+    ttk.Button(chart_frame, text="View Bills", command=view_bills).pack(side="left", padx=5)
+    ttk.Button(chart_frame, text="Export Report", command=export_report).pack(side="left", padx=5)
+
+    # Footer
+    footer_frame = ttk.Frame(root, padding=10)
+    footer_frame.pack(fill="x", side="bottom")
+
+    ttk.Label(footer_frame, text=f"© {datetime.today().year} Python Inventory System", 
+              style="TLabel").pack(side="right")
+
+    progress_bar = ttk.Progressbar(footer_frame, mode="indeterminate", length=120)
+
+    tasks = TaskRunner(root, on_busy=set_busy)
+
+    # Initial setup
+    refresh_inventory_table()
+    show_low_stock_badge()
+    root.after(SYNC_MS, sync_stock)
+    if instrument.ENABLED:
+        root.bind("<F12>", show_diagnostics)
+
+    root.mainloop()
@@ -0,0 +1,17 @@
+import io
+
+from inventory.imports import read_delivery
+from inventory.storage import CsvBackend
+from inventory.store import InventoryStore
+
+INVENTORY = "product_id,name,quantity,price,min_stock\n1,Pen,10,5.0,2\n2,Pad,4,30.0,5\n"
+
+
+def test_rejected_lines_keep_file_line_numbers_past_blank_lines(tmp_path):
+    (tmp_path / "inventory.csv").write_text(INVENTORY, encoding="utf-8")
+    store = InventoryStore(CsvBackend(str(tmp_path)))
+    for chunksize in (1, 2, 50):
+        source = io.StringIO("product_id,quantity,price\n1,5,\n\n\n2,x,\n\n7,1,\n")
+        deltas, prices, rejected = read_delivery(store, source, chunksize)
+        assert deltas.to_dict() == {1: 5}
+        assert rejected[["line", "reason"]].values.tolist() == [[5, "invalid quantity"], [7, "unknown product_id"]]
@@ -0,0 +1,49 @@
+import random
+
+from inventory.search import NameIndex, match_class
+
+NAMES = ["Blue Pen", "pen refill", "Pencil-Box", "Straße Map", "STRASSE sign", "Crème brûlée", "A4 pad (x10)",
+         "x-ray film", "Ink: black", "İstanbul tea", "ΣΊΣΥΦΟΣ mug", "peN", "a", "", "Ink.Pen", "e-Pen pro"]
+ADDED = ["Open pen", "Groß pad", "ink-jet"]
+
+
+def brute_force(names, query):
+    query = query.casefold()
+    matches = [(match_class(str(name).casefold(), query), pos) for pos, name in enumerate(names)]
+    return [pos for cls, pos in sorted(match for match in matches if match[0] is not None)]
+
+
+def queries(names):
+    found = {"ß", "SS", "-", " ", "(", ":", "é", "zz", "€", "pen", "PEN ", "i̇", "σ", "ς", "x10)"}
+    for name in names:
+        folded = name.casefold()
+        for n in (1, 2, 3, 4):
+            found.update(folded[i:i + n] for i in range(len(folded) - n + 1))
+            found.update(name[i:i + n] for i in range(len(name) - n + 1))
+    return sorted(found)
+
+
+def test_name_index_matches_brute_force():
+    index = NameIndex(NAMES)
+    for query in queries(NAMES):
+        assert index.search(query).tolist() == brute_force(NAMES, query), query
+
+
+def test_name_index_matches_brute_force_after_adds():
+    index = NameIndex(NAMES)
+    for name in ADDED:
+        index.add(name)
+    names = NAMES + ADDED
+    for query in queries(names):
+        assert index.search(query).tolist() == brute_force(names, query), query
+
+
+def test_name_index_matches_brute_force_on_random_names():
+    rng = random.Random(7)
+    alphabet = "abcAB ß-.é"
+    names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))) for _ in range(300)]
+    index = NameIndex(names[:250])
+    for name in names[250:]:
+        index.add(name)
+    for query in queries(names[:40]):
+        assert index.search(query).tolist() == brute_force(names, query), query
@@ -0,0 +1,144 @@
+import os
+
+import pandas as pd
+
+from inventory import storage
+from inventory.storage import CsvBackend
+
+INVENTORY = "product_id,name,quantity,price,min_stock\n1,Pen,10,5.0,2\n2,Pad,4,30.0,5\n3,Ink,7,12.5,1"
+TRANSACTIONS = "date,time,product_id,quantity_sold\n2023-10-01,10:00,1,2\n2023-10-02,12:00,3,3"
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_snapshot_keeps_last_row_without_newline(tmp_path):
+    write(tmp_path / "inventory.csv", INVENTORY)
+    for _ in range(2):  # cold parse, then from the snapshot
+        df = CsvBackend(str(tmp_path)).load_inventory()
+        assert df["product_id"].tolist() == [1, 2, 3]
+        assert df["quantity"].dtype == "int64"
+
+
+def test_snapshot_matches_plain_parse(tmp_path, monkeypatch):
+    write(tmp_path / "transactions.csv", TRANSACTIONS)
+    cached = CsvBackend(str(tmp_path)).load_transactions(typed=True)
+    monkeypatch.setattr(storage, "SNAPSHOTS", False)
+    plain = CsvBackend(str(tmp_path)).load_transactions(typed=True)
+    pd.testing.assert_frame_equal(cached, plain)
+    assert len(plain) == 2
+
+
+def test_append_after_row_without_newline(tmp_path):
+    write(tmp_path / "transactions.csv", TRANSACTIONS)
+    backend = CsvBackend(str(tmp_path))
+    assert len(backend.load_transactions(typed=True)) == 2
+    backend.commit(transactions=pd.DataFrame([["2023-10-03", "09:00", 2, 1]], columns=storage.TRANSACTION_COLUMNS))
+    df = CsvBackend(str(tmp_path)).load_transactions(typed=True)
+    assert df["product_id"].tolist() == [1, 3, 2]
+    assert df["quantity_sold"].tolist() == [2, 3, 1]
+
+
+def test_touched_csv_keeps_column_types(tmp_path):
+    write(tmp_path / "inventory.csv", INVENTORY + "\n")
+    CsvBackend(str(tmp_path)).load_inventory()
+    os.utime(tmp_path / "inventory.csv", ns=(0, 0))
+    df = CsvBackend(str(tmp_path)).load_inventory()
+    assert df["product_id"].dtype == "int64"
+    assert df["price"].dtype == "float64"
+
+
+def test_iter_chunks_streams_last_row_without_newline(tmp_path):
+    write(tmp_path / "transactions.csv", TRANSACTIONS)
+    chunks = list(CsvBackend(str(tmp_path)).iter_chunks("transactions", chunksize=1))
+    assert pd.concat(chunks)["product_id"].tolist() == [1, 3]
+
+
+def sale(product_id, quantity):
+    return pd.DataFrame([["2023-10-03", "09:00", product_id, quantity]], columns=storage.TRANSACTION_COLUMNS)
+
+
+def stock(product_id, quantity):
+    return pd.DataFrame([[product_id, "Pen", quantity, 5.0, 2]], columns=storage.INVENTORY_COLUMNS)
+
+
+class Crash(Exception):
+    pass
+
+
+def crash(record):
+    raise Crash()
+
+
+def test_recover_finishes_commit_logged_before_any_append(tmp_path, monkeypatch):
+    write(tmp_path / "inventory.csv", INVENTORY)
+    write(tmp_path / "transactions.csv", TRANSACTIONS)
+    backend = CsvBackend(str(tmp_path))
+    with monkeypatch.context() as m:
+        m.setattr(storage, "apply_wal_record", crash)
+        try:
+            backend.commit(transactions=sale(2, 1), inventory=stock(1, 8))
+        except Crash:
+            pass
+    assert (tmp_path / "checkout.wal").exists()
+    assert CsvBackend(str(tmp_path)).recover() is True
+    assert not (tmp_path / "checkout.wal").exists()
+    assert CsvBackend(str(tmp_path)).recover() is False
+    df = CsvBackend(str(tmp_path)).load_transactions(typed=True)
+    assert df["product_id"].tolist() == [1, 3, 2]
+    assert CsvBackend(str(tmp_path)).load_inventory().set_index("product_id").loc[1, "quantity"] == 8
+
+
+def test_recover_rewrites_partial_append(tmp_path, monkeypatch):
+    write(tmp_path / "transactions.csv", TRANSACTIONS + "\n")
+    write(tmp_path / "bills.csv", ",".join(storage.BILL_COLUMNS) + "\n")
+
+    def torn_append(record):
+        # The first file gets half its rows and the process dies
+        entry = record["appends"][0]
+        with open(entry["path"], "ab") as f:
+            f.write(entry["data"].encode("utf-8")[:len(entry["data"]) // 2])
+        raise Crash()
+
+    bills = pd.DataFrame([["B1", "2023-10-03 09:00", "Pen", 3, 5.0, 15.0, 0.75, 15.75, "Walk-in"]],
+                         columns=storage.BILL_COLUMNS)
+    with monkeypatch.context() as m:
+        m.setattr(storage, "apply_wal_record", torn_append)
+        try:
+            CsvBackend(str(tmp_path)).commit(bills=bills, transactions=sale(1, 3))
+        except Crash:
+            pass
+    assert CsvBackend(str(tmp_path)).recover() is True
+    backend = CsvBackend(str(tmp_path))
+    assert backend.load_bills()["bill_id"].tolist() == ["B1"]
+    assert backend.load_transactions()["quantity_sold"].tolist() == [2, 3, 3]
+
+
+def test_recover_drops_torn_wal(tmp_path):
+    write(tmp_path / "transactions.csv", TRANSACTIONS + "\n")
+    record = {"appends": [{"path": str(tmp_path / "transactions.csv"), "offset": 0, "data": "lost"}]}
+    write(tmp_path / "checkout.wal", storage.json.dumps(record)[:20])
+    assert CsvBackend(str(tmp_path)).recover() is False
+    assert not (tmp_path / "checkout.wal").exists()
+    assert (tmp_path / "transactions.csv").read_text(encoding="utf-8") == TRANSACTIONS + "\n"
+
+
+def test_compact_keeps_rows_another_backend_has_not_seen(tmp_path):
+    write(tmp_path / "inventory.csv", INVENTORY)
+    mine, other = CsvBackend(str(tmp_path)), CsvBackend(str(tmp_path))
+    mine.load_inventory()
+    other.load_inventory()
+    mine.commit(inventory=stock(2, 9))
+    other.commit(inventory=stock(1, 1))
+    # mine has not read other's row yet; compacting must not lose it
+    mine.compact()
+    rows = mine.changes()
+    assert rows.set_index("product_id").loc[1, "quantity"] == 1
+    assert mine.changes() is None
+    # other sees the journal was replaced and starts again from the files
+    rows = other.changes().set_index("product_id")
+    assert rows.loc[1, "quantity"] == 1 and rows.loc[2, "quantity"] == 9
+    df = CsvBackend(str(tmp_path)).load_inventory().set_index("product_id")
+    assert df["quantity"].tolist() == [1, 9, 7]
@@ -0,0 +1,107 @@
+import pytest
+
+from inventory import store
+from inventory.service import InventoryService
+from inventory.storage import CsvBackend, SqliteBackend, import_csv_to_sqlite
+
+INVENTORY = "product_id,name,quantity,price,min_stock\n1,Pen,10,5.0,2\n2,Pad,4,30.0,5\n3,Ink,7,12.5,1\n"
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def tills(request, tmp_path):
+    """A function returning a new till (service with its own backend) on one shared data set"""
+    (tmp_path / "inventory.csv").write_text(INVENTORY, encoding="utf-8")
+    if request.param == "sqlite":
+        db = str(tmp_path / "inventory.db")
+        import_csv_to_sqlite(db, str(tmp_path)).conn.close()
+        return lambda: InventoryService(SqliteBackend(db))
+    return lambda: InventoryService(CsvBackend(str(tmp_path)))
+
+
+def test_two_tills_cannot_both_sell_the_last_units(tills):
+    a, b = tills(), tills()
+    a.sell([(2, 3)])
+    with pytest.raises(ValueError, match="Only 1 units"):
+        b.sell([(2, 2)])
+    b.sell([(2, 1)])
+    with pytest.raises(ValueError):
+        a.sell([(2, 1)])
+    assert int(tills().store.get(2)["quantity"]) == 0
+
+
+def test_held_stock_is_kept_from_other_tills_until_released(tills):
+    a, b = tills(), tills()
+    a.add_to_basket("a", 2, 3)
+    with pytest.raises(ValueError, match="Only 1 units"):
+        b.add_to_basket("b", 2, 2)
+    with pytest.raises(ValueError):
+        b.sell([(2, 2)])
+    a.release_basket("a")
+    item = b.add_to_basket("b", 2, 4)
+    b.checkout([item], basket="b")
+    assert int(a.store.get(2)["quantity"]) == 4  # not synced yet
+    a.sync()
+    assert int(a.store.get(2)["quantity"]) == 0
+    assert a.store.held().empty
+
+
+def test_expired_holds_free_their_stock(tills, monkeypatch):
+    a, b = tills(), tills()
+    monkeypatch.setattr(store, "RESERVATION_SECONDS", 0)
+    a.add_to_basket("a", 2, 4)
+    b.sell([(2, 4)])
+    with pytest.raises(ValueError):
+        a.checkout([a.line_item(2, 4)], basket="a")
+
+
+def test_non_positive_quantities_hold_nothing(tills):
+    a, b = tills(), tills()
+    with pytest.raises(ValueError, match="Invalid quantity"):
+        a.add_to_basket("a", 2, -6)
+    b.sell([(2, 4)])
+    assert a.store.held().empty
+
+
+def test_sync_after_another_till_compacts(tmp_path):
+    (tmp_path / "inventory.csv").write_text(INVENTORY, encoding="utf-8")
+    a, b = InventoryService(CsvBackend(str(tmp_path))), InventoryService(CsvBackend(str(tmp_path)))
+    a.restock(1, 5)
+    b.restock(3, 2)
+    b.sell([(2, 1)])
+    b.backend.compact()
+    assert a.sync() is True
+    assert [int(a.store.get(pid)["quantity"]) for pid in (1, 2, 3)] == [15, 3, 9]
+    a.sell([(2, 3)])
+    with pytest.raises(ValueError):
+        b.sell([(2, 1)])
+    assert int(b.store.get(2)["quantity"]) == 0
+
+
+def test_sync_brings_in_other_tills_bills_and_sales(tills):
+    a, b = tills(), tills()
+    a.aggregates, a.bill_index  # built before the other till sells
+    bill = b.sell([(3, 2)])
+    a.sync()
+    assert a.aggregates.product_totals().get(3) == 2
+    assert len(a.bill_index.search("Ink")) == 1
+    assert bill["bill_id"] in a.bill_ids.known
+    a.sync()
+    assert a.aggregates.product_totals().get(3) == 2
+
+
+def test_restock_and_sell_reject_non_positive_quantities(tills):
+    a = tills()
+    for qty in (0, -10):
+        with pytest.raises(ValueError, match="Invalid quantity"):
+            a.restock(3, qty)
+        with pytest.raises(ValueError, match="Invalid quantity"):
+            a.sell([(1, 2), (3, qty)])
+    assert [int(tills().store.get(pid)["quantity"]) for pid in (1, 3)] == [10, 7]
+
+
+def test_tills_on_shared_data_claim_different_till_numbers(tills, monkeypatch):
+    a, b = tills(), tills()
+    assert a.bill_ids.till != b.bill_ids.till
+    monkeypatch.setenv("INVENTORY_TILL_ID", str(a.bill_ids.till))
+    with pytest.raises(ValueError, match="already in use"):
+        tills().bill_ids